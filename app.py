@@ -2,83 +2,62 @@
 import streamlit as st
 import pandas as pd
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode, JsCode
-from utils.db_functions import get_source_data, insert_receiving_data
-from datetime import date
+from utils.db_functions import insert_receiving_data
+from utils.data_access import (
+    check_submission, get_reconciled_rows, get_source_selector_index, get_source_view, invalidate_inbound_data,
+    show_data_age, to_display_frame
+)
+from utils.perf import render_debug_panel, timed
+from utils import submission_store
+from utils.bulk_import import LINE_COLUMN, REQUIRED_COLUMNS, import_receiving_file
+from utils.validation import annotation_frame, has_errors, validate_submission
 
 # --- 페이지 설정 ---
 st.set_page_config(layout="wide", page_title="입고 등록 관리 시스템")
 st.title("📦 입고 등록 관리 시스템")
 
 # --- 세션 상태 초기화 ---
-if 'submission_list' not in st.session_state:
-    st.session_state.submission_list = pd.DataFrame()
+submission_store.init_store(st.session_state)
 
 # --- 데이터 로딩 ---
-@st.cache_data
-def load_data():
-    """ERP DB에서 입고 예정 데이터를 불러옵니다."""
-    df = get_source_data()
-    if '입고예정일' in df.columns:
-        df['입고예정일'] = pd.to_datetime(df['입고예정일']).dt.strftime('%Y-%m-%d')
-    if '예정수량' in df.columns:
-        df['예정수량'] = pd.to_numeric(df['예정수량'], errors='coerce').fillna(0).astype(int)
-    return df
-
-source_df = load_data()
+source_df = get_source_view()
+selector_index = get_source_selector_index(source_df)
+show_data_age(source_df)
 
 # --- 공통 함수 ---
 def add_to_submission_list(items_df):
-    """선택된 항목을 아래 편집 리스트에 추가하는 함수"""
+    """선택된 항목을 아래 편집 리스트에 추가하는 함수 (이미 있는 발주번호/품번/버전은 건너뜀)"""
     if not items_df.empty:
-        new_items = items_df.copy()
-        new_items['삭제'] = False
-        new_items['입고일자'] = date.today().strftime("%Y-%m-%d")
-        new_items['LOT'] = ''
-        new_items['유통기한'] = ''
-        new_items['확정수량'] = 0
-        
-        current_list = st.session_state.submission_list
-        combined_list = pd.concat([current_list, new_items]).reset_index(drop=True)
-        st.session_state.submission_list = combined_list
+        added, skipped = submission_store.add_items(st.session_state, items_df)
+        if skipped:
+            st.toast(f"이미 리스트에 있는 {skipped}개 품목은 건너뛰었습니다.")
         st.rerun()
 
 # --- UI 섹션 ---
 st.header("1. 조회 조건 선택")
 
-# 1. 연쇄 드롭다운 선택 UI
+# 1. 연쇄 드롭다운 선택 UI (데이터 로딩 시 만든 브랜드 → 품번 → 발주번호 색인 사용)
 selected_po = None
 if not source_df.empty:
-    brands = sorted(source_df['브랜드'].dropna().unique())
+    brand_index = selector_index['brands']
     selected_brand = st.selectbox(
-        "**브랜드**를 선택하세요.", options=brands, index=None, placeholder="브랜드 검색..."
+        "**브랜드**를 선택하세요.", options=sorted(brand_index), index=None, placeholder="브랜드 검색..."
     )
     if selected_brand:
-        brand_df = source_df[source_df['브랜드'] == selected_brand]
-        
-        # ▼▼▼ [수정된 부분] ▼▼▼
-        # 품번과 품명을 조합하여 드롭다운 옵션 생성
-        part_number_map_df = brand_df[['품번', '품명']].drop_duplicates()
-        part_number_map_df['formatted'] = part_number_map_df.apply(
-            lambda row: f"{row['품번']} ({row['품명']})", axis=1
-        )
-        part_number_options = sorted(part_number_map_df['formatted'].unique())
+        brand_entry = brand_index[selected_brand]
+        part_labels = brand_entry['parts']
 
-        selected_part_number_formatted = st.selectbox(
+        # 옵션 값은 품번 그대로 두고, 화면에만 '품번 (품명)'으로 표시
+        selected_part_number = st.selectbox(
             "**품번**을 선택하세요.",
-            options=part_number_options,
+            options=list(part_labels),
+            format_func=part_labels.get,
             index=None,
             placeholder="품번(품명) 검색..."
         )
 
-        # 선택된 옵션에서 실제 품번 추출
-        selected_part_number = None
-        if selected_part_number_formatted:
-            selected_part_number = selected_part_number_formatted.split(" ")[0]
-        # ▲▲▲ [수정된 부분] ▲▲▲
-
         if selected_part_number:
-            part_number_df = brand_df[brand_df['품번'] == selected_part_number]
-            po_numbers = sorted(part_number_df['발주번호'].unique())
+            po_numbers = brand_entry['pos'][selected_part_number]
             selected_po = st.selectbox(
                 "**발주번호**를 선택하세요.", options=po_numbers, index=None, placeholder="발주번호 검색..."
             )
@@ -89,20 +68,37 @@ else:
 st.header("2. 입고 예정 품목 선택")
 if selected_po:
     st.info(f"**'{selected_po}'** 발주 건의 품목 리스트입니다. 체크박스로 추가할 항목을 선택하세요.")
-    source_grid_df = source_df[source_df['발주번호'] == selected_po].copy()
+
+    # 발주 품목별 예정 합계 대비 입고 확정 수량 (발주번호 한 번의 조회로 계산)
+    po_rows = get_reconciled_rows(source_df.iloc[selector_index['po_rows'][selected_po]])
+    if '입고상태' in po_rows.columns and po_rows['입고상태'].eq('초과입고').any():
+        over_parts = ', '.join(po_rows.loc[po_rows['입고상태'] == '초과입고', '품번'].astype(str).unique())
+        st.warning(f"⚠️ 예정수량보다 많이 입고된 품목이 있습니다: {over_parts}")
+    source_grid_df = to_display_frame(po_rows)
     
-    gb_source = GridOptionsBuilder.from_dataframe(source_grid_df)
-    gb_source.configure_selection('multiple', use_checkbox=True, header_checkbox=True)
-    gridOptions_source = gb_source.build()
+    with timed('app.aggrid_options', rows=len(source_grid_df)):
+        gb_source = GridOptionsBuilder.from_dataframe(source_grid_df)
+        gb_source.configure_selection('multiple', use_checkbox=True, header_checkbox=True)
+        if '입고상태' in source_grid_df.columns:
+            gb_source.configure_column('입고상태', cellStyle=JsCode("""
+                function(params) {
+                    if (params.value === '초과입고') { return {color: 'white', backgroundColor: '#d9534f'}; }
+                    if (params.value === '입고완료') { return {color: '#999999'}; }
+                    return null;
+                }
+            """))
+        gridOptions_source = gb_source.build()
     
-    source_grid_response = AgGrid(
-        source_grid_df, 
-        gridOptions=gridOptions_source, 
-        height=300, 
-        theme='streamlit',
-        update_mode=GridUpdateMode.SELECTION_CHANGED,
-        key='source_grid'
-    )
+    with timed('app.aggrid_render', rows=len(source_grid_df)):
+        source_grid_response = AgGrid(
+            source_grid_df, 
+            gridOptions=gridOptions_source, 
+            height=300, 
+            theme='streamlit',
+            update_mode=GridUpdateMode.SELECTION_CHANGED,
+            key='source_grid',
+            allow_unsafe_jscode=True
+        )
 
     selected_rows = pd.DataFrame(source_grid_response["selected_rows"])
     if st.button("🔽 체크된 항목 모두 아래에 추가", disabled=selected_rows.empty):
@@ -113,7 +109,7 @@ else:
 
 # 3. (하단) 편집 및 최종 등록용 그리드 (st.data_editor)
 st.header("3. 입고 정보 편집 및 최종 등록")
-if not st.session_state.submission_list.empty:
+if not submission_store.is_empty(st.session_state):
     
     st.info("아래 표의 셀을 더블클릭하여 입고 정보를 직접 수정하세요. (엑셀처럼 복사/붙여넣기 가능)")
     
@@ -130,13 +126,16 @@ if not st.session_state.submission_list.empty:
         "예정수량": None,
     }
 
-    edited_df = st.data_editor(
-        st.session_state.submission_list,
+    # 편집할 때마다 위젯 변경분을 저장소에 반영합니다 (다른 페이지로 가면 위젯 상태가 사라지므로).
+    st.data_editor(
+        submission_store.get_editor_frame(st.session_state),
         column_order=column_order,
         column_config=column_config,
         hide_index=True,
         num_rows="dynamic",
-        key='submission_editor'
+        key=submission_store.editor_key(st.session_state),
+        on_change=submission_store.commit_editor_delta,
+        args=(st.session_state,)
     )
 
     col1, col2 = st.columns(2)
@@ -144,32 +143,128 @@ if not st.session_state.submission_list.empty:
     clear_button = col2.button("✨ 리스트 비우기")
     
     if delete_button:
-        rows_to_keep = edited_df[edited_df['삭제'] == False]
-        st.session_state.submission_list = rows_to_keep
+        submission_store.remove_flagged(st.session_state)
         st.rerun()
     elif clear_button:
-        st.session_state.submission_list = pd.DataFrame()
+        submission_store.clear_store(st.session_state)
         st.rerun()
-    else:
-        st.session_state.submission_list = edited_df
             
     st.divider()
     if st.button("✅ 편집 리스트 전체 등록 및 DB 전송", type="primary"):
-        final_df = st.session_state.submission_list.drop(columns=['삭제'], errors='ignore')
+        final_df = submission_store.to_frame(st.session_state).drop(columns=['삭제'], errors='ignore')
         
-        if final_df['LOT'].str.strip().eq('').any():
-            st.error("⚠️ LOT 번호는 모든 품목에 대해 필수 입력 항목입니다.")
+        over_df = pd.DataFrame()
+        try:
+            errors, over_df = check_submission(final_df)
+        except Exception as e:
+            st.warning(f"입고 확정 수량을 확인하지 못해 기존 등록·초과 입고 검사를 건너뜁니다: {e}")
+            errors = validate_submission(final_df)
+        warnings = errors[errors['심각도'] == 'warning']
+        # 경고(초과 입고, 기존 LOT 덮어쓰기)는 한 번 보여 주고, 같은 내용으로 다시 누르면 그대로 등록합니다.
+        over_signature = (
+            over_df.to_json() + warnings.to_json() if not (over_df.empty and warnings.empty) else None
+        )
+
+        if has_errors(errors):
+            st.error(f"⚠️ 입력 오류 {int((errors['심각도'] == 'error').sum())}건을 고친 뒤 다시 전송하세요.")
+            # 오류가 있는 셀을 칠하고, 셀별 메시지는 아래 표에 모아 보여 줍니다.
+            shown = final_df.reset_index(drop=True)[[c for c in column_order if c in final_df.columns]]
+            cells = annotation_frame(shown, errors[errors['심각도'] == 'error'])
+            st.dataframe(
+                shown.style.apply(lambda _: cells.where(cells.eq(''), 'background-color: #f8d7da'), axis=None),
+                hide_index=True, use_container_width=True
+            )
+            st.dataframe(errors.assign(행=errors['행'] + 1), hide_index=True, use_container_width=True)
+        elif over_signature and st.session_state.get('over_receipt_ack') != over_signature:
+            st.session_state.over_receipt_ack = over_signature
+            if not over_df.empty:
+                st.warning("⚠️ 예정수량보다 많이 입고되는 품목이 있습니다. 확인 후 다시 누르면 그대로 등록합니다.")
+                st.dataframe(over_df, hide_index=True, use_container_width=True)
+            if not warnings.empty:
+                st.warning("⚠️ 이미 다른 수량으로 등록된 LOT가 있습니다. 확인 후 다시 누르면 덮어씁니다.")
+                st.dataframe(warnings.assign(행=warnings['행'] + 1), hide_index=True, use_container_width=True)
         else:
+            st.session_state.pop('over_receipt_ack', None)
             with st.spinner('데이터를 DB에 저장하는 중입니다...'):
                 data_to_submit = final_df.to_dict('records')
                 success, message = insert_receiving_data(data_to_submit)
                 
                 if success:
                     st.success(f"✅ 성공! {len(data_to_submit)}개의 데이터를 DB에 전송했습니다.")
-                    st.session_state.submission_list = pd.DataFrame()
-                    st.cache_data.clear()
+                    submission_store.clear_store(st.session_state)
+                    invalidate_inbound_data(final_df['발주번호'], final_df.get('입고예정일'))
                     st.rerun()
                 else:
                     st.error(f"DB 전송 실패: {message}")
 else:
     st.info("위에서 품목을 추가하면 여기에 표시됩니다.")
+
+# 4. 파일 일괄 등록 (편집 그리드를 거치지 않고 CSV/엑셀 파일을 바로 검사해 전송)
+st.header("4. 파일로 일괄 등록")
+st.caption(
+    f"필수 열: {', '.join(REQUIRED_COLUMNS)} (선택: 버전, 유통기한, 입고일자 — 없으면 오늘). "
+    "최근 조회 기간의 입고 예정 데이터와 발주번호/품번/버전으로 맞춰 본 뒤, 맞은 행만 등록합니다."
+)
+uploaded = st.file_uploader("입고 확정 파일 (CSV/XLSX)", type=['csv', 'xlsx'])
+if uploaded is not None and st.button("📤 파일 검사 및 DB 전송", type="primary"):
+    try:
+        with timed('import.read_match', file_bytes=uploaded.size):
+            matched_df, unmatched_df = import_receiving_file(uploaded, uploaded.name, source_df)
+    except ImportError:
+        st.error("엑셀 파일을 읽으려면 openpyxl 패키지가 필요합니다. CSV로 저장해 올려 주세요.")
+        st.stop()
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"파일을 읽지 못했습니다: {e}")
+        st.stop()
+
+    st.write(f"파일 {len(matched_df) + len(unmatched_df):,}행 중 예정 데이터와 맞은 행 {len(matched_df):,}개")
+    if not unmatched_df.empty:
+        st.warning(f"⚠️ 예정 데이터에 없는 발주번호/품번/버전 {len(unmatched_df):,}행은 등록하지 않습니다.")
+        st.dataframe(unmatched_df, hide_index=True, use_container_width=True)
+        st.download_button(
+            "못 맞춘 행 CSV 내려받기", unmatched_df.to_csv(index=False).encode('utf-8-sig'),
+            file_name=f"unmatched_{uploaded.name.rsplit('.', 1)[0]}.csv", mime='text/csv'
+        )
+
+    if not matched_df.empty:
+        import_over_df = pd.DataFrame()
+        try:
+            import_errors, import_over_df = check_submission(matched_df)
+        except Exception as e:
+            st.warning(f"입고 확정 수량을 확인하지 못해 기존 등록·초과 입고 검사를 건너뜁니다: {e}")
+            import_errors = validate_submission(matched_df)
+        # 오류 위치는 편집 리스트의 행 번호 대신 파일의 줄 번호로 보여 줍니다.
+        import_errors = import_errors.assign(행=matched_df[LINE_COLUMN].to_numpy()[import_errors['행'].astype(int)])
+        import_warnings = import_errors[import_errors['심각도'] == 'warning']
+        import_signature = (
+            import_over_df.to_json() + import_warnings.to_json()
+            if not (import_over_df.empty and import_warnings.empty) else None
+        )
+
+        if has_errors(import_errors):
+            st.error(f"⚠️ 입력 오류 {int((import_errors['심각도'] == 'error').sum())}건 — 파일을 고친 뒤 다시 올려 주세요.")
+            st.dataframe(import_errors.rename(columns={'행': LINE_COLUMN}), hide_index=True, use_container_width=True)
+        elif import_signature and st.session_state.get('import_ack') != import_signature:
+            st.session_state.import_ack = import_signature
+            st.warning("⚠️ 확인이 필요한 항목이 있습니다. 확인 후 다시 누르면 그대로 등록합니다.")
+            if not import_over_df.empty:
+                st.dataframe(import_over_df, hide_index=True, use_container_width=True)
+            if not import_warnings.empty:
+                st.dataframe(
+                    import_warnings.rename(columns={'행': LINE_COLUMN}), hide_index=True, use_container_width=True
+                )
+        else:
+            st.session_state.pop('import_ack', None)
+            with st.spinner('데이터를 DB에 저장하는 중입니다...'):
+                success, message = insert_receiving_data(matched_df)
+            if success:
+                st.success(f"✅ 성공! 파일의 {len(matched_df):,}개 행을 DB에 전송했습니다.")
+                # 파일에는 입고예정일이 없으므로 예정 데이터에서 그 발주번호들의 예정일을 찾아 요약 캐시도 비웁니다.
+                imported_pos = matched_df['발주번호'].astype(str)
+                invalidate_inbound_data(
+                    imported_pos, source_df.loc[source_df['발주번호'].astype(str).isin(imported_pos), '입고예정일']
+                )
+            else:
+                st.error(f"DB 전송 실패: {message}")
+
+render_debug_panel()
@@ -0,0 +1,105 @@
+# benchmarks/explain_queries.py
+"""
+등록된 쿼리(utils.queries)의 실행 계획 확인.
+
+로컬 SQLite 대체 DB에 합성 데이터를 만들고, 등록된 쿼리마다 예시 파라미터로 EXPLAIN QUERY PLAN을 실행합니다.
+인덱스 없이 테이블 전체를 읽는 단계(전체스캔)를 표시하므로 쿼리를 바꾼 뒤 실행 계획이 나빠졌는지,
+어떤 인덱스가 필요할지 운영 DB에 가기 전에 확인할 수 있습니다. 저장소 루트에서 실행합니다:
+
+    python -m benchmarks.explain_queries --rows 10000 --json plans.jsonl
+
+운영 DB에서는 utils.queries.explain()을 같은 방식으로 호출하면 MySQL EXPLAIN 결과를 받습니다.
+"""
+import argparse
+import json
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+from streamlit import logger as st_logger
+
+from benchmarks.run_benchmarks import _git_revision, use_standin_engine
+from benchmarks.standin_db import create_standin_engine, generate
+from utils import db_functions
+from utils.queries import explain, registered_queries
+
+def sample_arguments(engine):
+    """쿼리 이름 → (params, expanding, fragments). 대체 DB에 실제로 있는 발주번호·브랜드로 채웁니다."""
+    since = db_functions.default_since()
+    until = since + timedelta(days=90)
+    watermark = (datetime.now() - timedelta(days=1)).isoformat(' ', timespec='seconds')
+    pos = pd.read_sql(
+        "SELECT po_no FROM boosters.nansoft_intended_inventorys ORDER BY id LIMIT 100", engine
+    )['po_no'].tolist()
+    brands = ['이퀄베리', '브랜든']
+    clauses, history_params, history_expanding = db_functions._history_filters(since, until, brands, '')
+    where = '\n        AND '.join(clauses)
+    return {
+        'erp.intended_inventory': ({'since': since}, (), {'until_filter': ''}),
+        'erp.history_page': ({**history_params, 'limit': 100}, history_expanding, {'where': where}),
+        'erp.history_count': (history_params, history_expanding, {'where': where}),
+        'erp.changed_intended_ids': ({'watermark': watermark}, (), {'wm': 'updated_at'}),
+        'erp.max_watermark': ({}, (), {'wm': 'updated_at'}),
+        'erp.snapshot_rows': ({'since': since}, (), {'id_filter': ''}),
+        'erp.summary_planned': ({'since': since}, (), {'po_filter': ''}),
+        'erp.changed_pos': ({'watermark': watermark}, (), {'wm': 'updated_at'}),
+        'scm.received_quantities': ({'pos': pos}, (), None),
+        'scm.summary_confirmed': ({'pos': pos}, (), None),
+        'scm.summary_rows_by_po': ({'pos': pos}, (), None),
+        'scm.summary_range': (
+            {'start_date': since, 'end_date': until}, (), {'select': '*', 'brand_filter': ''}
+        ),
+    }
+
+def capture_plans(engine, names=None):
+    """등록된 쿼리(names가 있으면 그 쿼리만)의 실행 계획을 하나의 DataFrame으로 모읍니다."""
+    samples = sample_arguments(engine)
+    plans = []
+    for query in registered_queries():
+        if names and query.name not in names:
+            continue
+        if query.name not in samples:
+            print(f"[건너뜀] {query.name}: 예시 파라미터가 없습니다 (sample_arguments에 추가하세요).")
+            continue
+        params, expanding, fragments = samples[query.name]
+        plans.append(explain(query, engine, params, expanding, fragments))
+    return pd.concat(plans, ignore_index=True) if plans else pd.DataFrame()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="등록된 쿼리의 실행 계획 확인 (로컬 대체 DB)")
+    parser.add_argument('--rows', type=int, default=10_000, help="입고 예정 상세 행 수")
+    parser.add_argument('--query', nargs='+', help="확인할 쿼리 이름 (기본: 전체)")
+    parser.add_argument('--json', help="실행 계획을 JSON Lines로 덧붙일 파일 경로")
+    parser.add_argument('--workdir', help="대체 DB 파일 위치 (기본: 임시 디렉터리)")
+    args = parser.parse_args(argv)
+
+    st_logger.set_log_level('error')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = args.workdir or tmpdir
+        generate(workdir, args.rows)
+        engine = create_standin_engine(workdir)
+        use_standin_engine(engine)
+        # 요약 테이블 쿼리도 확인할 수 있도록 요약 테이블을 만들어 둡니다.
+        db_functions.refresh_daily_summary()
+        plans = capture_plans(engine, args.query)
+        engine.dispose()
+
+    if plans.empty:
+        print("확인한 쿼리가 없습니다.")
+        return
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.max_colwidth', 100):
+        for name, plan in plans.groupby('쿼리', sort=False):
+            print(f"\n== {name}")
+            print(plan[['detail', '전체스캔']].to_string(index=False))
+    scans = plans[plans['전체스캔']]
+    print(f"\n전체스캔 단계: {len(scans)}개 ({', '.join(scans['쿼리'].unique()) or '없음'})")
+
+    if args.json:
+        revision = _git_revision()
+        with open(args.json, 'a', encoding='utf-8') as f:
+            for record in plans.assign(rows=args.rows, revision=revision).to_dict('records'):
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+if __name__ == '__main__':
+    main()
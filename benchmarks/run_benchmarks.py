@@ -0,0 +1,167 @@
+# benchmarks/run_benchmarks.py
+"""
+입고 관리 데이터 경로 벤치마크.
+
+로컬 SQLite 대체 DB에 합성 데이터를 만들고, 운영 코드의 조회/등록/화면 가공 함수를 그대로 실행해 시간을 잽니다.
+저장소 루트에서 실행합니다:
+
+    python -m benchmarks.run_benchmarks --rows 10000 100000 --repeat 5 --json bench_results.jsonl
+
+--json으로 남긴 결과는 커밋/행 수/항목별로 한 줄씩 쌓이므로 변경 전후를 비교할 수 있습니다.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+from streamlit import logger as st_logger
+
+from benchmarks.standin_db import create_standin_engine, generate
+from utils import db_functions
+from utils.calendar_events import build_daily_brand_events, build_item_events
+from utils.data_access import build_selector_index, compact_schema, filter_calendar_rows
+from utils.search_index import build_search_index
+
+SELECTOR_PICKS = 20
+
+def use_standin_engine(engine):
+    """db_functions가 ERP/SCM 대신 대체 엔진을 쓰게 합니다."""
+    db_functions.init_connection_erp = lambda: engine
+    db_functions.init_connection_erp_read = lambda: engine
+    db_functions.init_connection_scm = lambda: engine
+
+def measure(func, repeat):
+    """func를 repeat번 실행해 각 실행 시간(ms) 목록과 마지막 결과를 반환합니다."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+def _receiving_rows(df, count, run_id):
+    rows = df.head(count).copy()
+    rows = rows.astype({col: object for col in rows.columns if isinstance(rows[col].dtype, pd.CategoricalDtype)})
+    rows['입고일자'] = date.today().isoformat()
+    rows['LOT'] = [f"BENCH-{run_id}-{i}" for i in range(len(rows))]
+    rows['유통기한'] = (date.today() + timedelta(days=365)).isoformat()
+    rows['확정수량'] = rows['예정수량']
+    return rows.drop(columns=['브랜드', '입고예정일']).to_dict('records')
+
+def _selector_picks(df):
+    picks = df[['브랜드', '품번']].drop_duplicates().head(SELECTOR_PICKS)
+    return list(picks.itertuples(index=False, name=None))
+
+def _naive_selector(df, picks):
+    """기존 app.py 방식: 선택할 때마다 전체 DataFrame을 필터링합니다."""
+    for brand, part in picks:
+        brand_df = df[df['브랜드'] == brand]
+        part_map = brand_df[['품번', '품명']].drop_duplicates()
+        part_map['formatted'] = part_map.apply(lambda row: f"{row['품번']} ({row['품명']})", axis=1)
+        sorted(part_map['formatted'].unique())
+        sorted(brand_df[brand_df['품번'] == part]['발주번호'].unique())
+
+def _indexed_selector(index, picks):
+    for brand, part in picks:
+        entry = index['brands'][brand]
+        list(entry['parts'])
+        entry['pos'][part]
+
+def run_cases(rows, repeat, workdir):
+    """rows 크기의 대체 DB에서 모든 항목을 측정하고 결과 dict 목록을 반환합니다."""
+    started = time.perf_counter()
+    sizes = generate(workdir, rows)
+    setup_ms = (time.perf_counter() - started) * 1000
+    engine = create_standin_engine(workdir)
+    use_standin_engine(engine)
+
+    since = db_functions.default_since()
+    source_df = compact_schema(db_functions.get_source_data())
+    picks = _selector_picks(source_df)
+    index = build_selector_index(source_df)
+    search_index = build_search_index(source_df, ['브랜드', '품명'])
+    brands = list(source_df['브랜드'].cat.categories)
+    insert_count = min(1000, max(rows // 10, 1))
+    run_ids = iter(range(repeat))
+
+    cases = {
+        'get_source_data': lambda: db_functions.get_source_data(),
+        'get_history_data': lambda: db_functions.get_history_data(),
+        'fetch_history_page(100)': lambda: db_functions.fetch_history_page(
+            since, since + timedelta(days=90), brands, '', 100
+        ),
+        f'insert_receiving_data({insert_count})': lambda: db_functions.insert_receiving_data(
+            _receiving_rows(source_df, insert_count, next(run_ids))
+        ),
+        'calendar.build_item_events': lambda: build_item_events(source_df),
+        'calendar.build_daily_brand_events': lambda: build_daily_brand_events(source_df),
+        f'selector.naive({len(picks)} picks)': lambda: _naive_selector(source_df, picks),
+        'selector.build_index': lambda: build_selector_index(source_df),
+        f'selector.index_lookup({len(picks)} picks)': lambda: _indexed_selector(index, picks),
+        'search.scan': lambda: filter_calendar_rows(source_df, brands, '상품0001'),
+        'search.build_index': lambda: build_search_index(source_df, ['브랜드', '품명']),
+        'search.index_lookup': lambda: filter_calendar_rows(source_df, brands, '상품0001', search_index),
+    }
+
+    results = [{'case': 'setup.generate', 'rows': rows, 'repeat': 1, 'min_ms': setup_ms, 'median_ms': setup_ms,
+                'result_rows': sizes['details']}]
+    for name, func in cases.items():
+        timings, result = measure(func, repeat)
+        results.append({
+            'case': name,
+            'rows': rows,
+            'repeat': repeat,
+            'min_ms': min(timings),
+            'median_ms': statistics.median(timings),
+            'result_rows': len(result) if isinstance(result, (pd.DataFrame, list)) else None,
+        })
+    engine.dispose()
+    return results
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="입고 관리 데이터 경로 벤치마크")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000],
+                        help="입고 예정 상세 행 수 (여러 개 지정 가능, 예: 10000 100000 1000000)")
+    parser.add_argument('--repeat', type=int, default=5, help="항목별 반복 횟수")
+    parser.add_argument('--json', help="결과를 JSON Lines로 덧붙일 파일 경로")
+    parser.add_argument('--workdir', help="대체 DB 파일 위치 (기본: 임시 디렉터리)")
+    args = parser.parse_args(argv)
+
+    # 스트림릿 런타임 밖에서 실행할 때 나오는 경고는 숨깁니다.
+    st_logger.set_log_level('error')
+
+    revision = _git_revision()
+    all_results = []
+    for rows in args.rows:
+        if args.workdir:
+            all_results += run_cases(rows, args.repeat, args.workdir)
+        else:
+            with tempfile.TemporaryDirectory() as workdir:
+                all_results += run_cases(rows, args.repeat, workdir)
+
+    report = pd.DataFrame(all_results)
+    report['result_rows'] = report['result_rows'].astype('Int64')
+    report['revision'] = revision
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.float_format', '{:.2f}'.format):
+        print(report[['rows', 'case', 'repeat', 'min_ms', 'median_ms', 'result_rows']].to_string(index=False))
+
+    if args.json:
+        with open(args.json, 'a', encoding='utf-8') as f:
+            for record in report.to_dict('records'):
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+if __name__ == '__main__':
+    main()
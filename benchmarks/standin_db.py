@@ -0,0 +1,142 @@
+# benchmarks/standin_db.py
+"""
+벤치마크용 로컬 대체 DB(SQLite)와 합성 데이터 생성기.
+
+boosters / boosters_erp / scm 스키마를 SQLite 파일로 ATTACH해서 운영 쿼리를 그대로 실행합니다.
+MySQL 전용 함수(SUBSTRING_INDEX, GREATEST)는 같은 동작의 Python 함수로 등록합니다.
+"""
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, event
+
+SCHEMAS = ['boosters', 'boosters_erp', 'scm']
+BRANDS = ['이퀄베리', '브랜든', '마켓올슨', '오하루', '하우스오브']
+
+DDL = [
+    """CREATE TABLE boosters.nansoft_intended_inventorys (
+        id INTEGER PRIMARY KEY, intended_push_date DATE, po_no TEXT, is_delete INTEGER, updated_at TIMESTAMP
+    )""",
+    """CREATE TABLE boosters.nansoft_intended_inventory_details (
+        id INTEGER PRIMARY KEY, nansoft_intended_inventory_id INTEGER, product_code TEXT, product_name TEXT,
+        lot TEXT, quantity INTEGER, updated_at TIMESTAMP
+    )""",
+    "CREATE INDEX boosters.ix_niid_header ON nansoft_intended_inventory_details (nansoft_intended_inventory_id)",
+    "CREATE INDEX boosters.ix_nii_push_date ON nansoft_intended_inventorys (intended_push_date)",
+    "CREATE TABLE boosters_erp.erp_items (itemno TEXT PRIMARY KEY, item_name TEXT)",
+    """CREATE TABLE scm.input_manage_master (
+        id INTEGER PRIMARY KEY, 입고일자 TEXT, 발주번호 TEXT, 품번 TEXT, 품명 TEXT,
+        버전 TEXT NOT NULL DEFAULT '', LOT TEXT NOT NULL DEFAULT '',
+        유통기한 TEXT, 확정수량 INTEGER, 확정일 TIMESTAMP, 입고예정수량 INTEGER,
+        UNIQUE (발주번호, 품번, 버전, LOT)
+    )""",
+]
+
+def _substring_index(value, delim, count):
+    if value is None:
+        return None
+    parts = value.split(delim)
+    return delim.join(parts[:count]) if count > 0 else delim.join(parts[count:])
+
+def _greatest(*values):
+    values = [v for v in values if v is not None]
+    return max(values) if values else None
+
+def create_standin_engine(directory):
+    """directory 아래 SQLite 파일들로 ERP/SCM 대체 엔진을 만듭니다 (ERP와 SCM이 같은 엔진을 씁니다)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{directory / 'main.sqlite'}")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        for schema in SCHEMAS:
+            dbapi_conn.execute(f"ATTACH DATABASE '{directory / schema}.sqlite' AS {schema}")
+        dbapi_conn.create_function('SUBSTRING_INDEX', 3, _substring_index, deterministic=True)
+        dbapi_conn.create_function('GREATEST', -1, _greatest, deterministic=True)
+
+    return engine
+
+def generate(directory, detail_rows, seed=0, confirmed_ratio=0.3):
+    """
+    detail_rows개의 입고 예정 상세 행과 그에 맞는 헤더/품목/입고 확정 행을 새로 만듭니다.
+    입고예정일은 오늘 기준 -14일 ~ +60일에 고르게 퍼집니다.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for schema in ['main', *SCHEMAS]:
+        (directory / f"{schema}.sqlite").unlink(missing_ok=True)
+
+    rng = np.random.default_rng(seed)
+    header_rows = max(detail_rows // 8, 1)
+    item_count = max(min(detail_rows // 20, 5000), 10)
+    today = date.today()
+    now = datetime.now().replace(microsecond=0)
+
+    item_brand = rng.integers(0, len(BRANDS), item_count)
+    items = [
+        (f"P{i:06d}", f"{BRANDS[item_brand[i]]}-상품{i:06d}")
+        for i in range(item_count)
+    ]
+    headers = [
+        (
+            i + 1,
+            (today + timedelta(days=int(offset))).isoformat(),
+            f"PO{i + 1:08d}",
+            int(deleted),
+            (now - timedelta(minutes=int(age))).isoformat(' '),
+        )
+        for i, (offset, deleted, age) in enumerate(zip(
+            rng.integers(-14, 61, header_rows),
+            rng.random(header_rows) < 0.02,
+            rng.integers(0, 60 * 24 * 30, header_rows),
+        ))
+    ]
+    detail_header = rng.integers(1, header_rows + 1, detail_rows)
+    detail_item = rng.integers(0, item_count, detail_rows)
+    detail_lot = rng.integers(0, 4, detail_rows)
+    detail_qty = rng.integers(1, 500, detail_rows)
+    details = (
+        (
+            j + 1,
+            int(detail_header[j]),
+            items[detail_item[j]][0],
+            items[detail_item[j]][1],
+            None if detail_lot[j] == 0 else f"V{detail_lot[j]}",
+            int(detail_qty[j]),
+            headers[detail_header[j] - 1][4],
+        )
+        for j in range(detail_rows)
+    )
+
+    conn = sqlite3.connect(directory / 'main.sqlite')
+    try:
+        for schema in SCHEMAS:
+            conn.execute(f"ATTACH DATABASE '{directory / schema}.sqlite' AS {schema}")
+        for ddl in DDL:
+            conn.execute(ddl)
+        conn.executemany("INSERT INTO boosters_erp.erp_items VALUES (?, ?)", items)
+        conn.executemany("INSERT INTO boosters.nansoft_intended_inventorys VALUES (?, ?, ?, ?, ?)", headers)
+        conn.executemany(
+            "INSERT INTO boosters.nansoft_intended_inventory_details VALUES (?, ?, ?, ?, ?, ?, ?)", details
+        )
+        # 이미 입고 확정된 행: 상세 행 일부를 골라 input_manage_master에 넣습니다.
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO scm.input_manage_master
+                (입고일자, 발주번호, 품번, 품명, 버전, LOT, 유통기한, 확정수량, 확정일, 입고예정수량)
+            SELECT nii.intended_push_date, nii.po_no, niid.product_code, niid.product_name, COALESCE(niid.lot, ''),
+                   'LOT-' || niid.id, DATE(nii.intended_push_date, '+365 day'), niid.quantity,
+                   nii.intended_push_date, niid.quantity
+            FROM boosters.nansoft_intended_inventory_details AS niid
+            JOIN boosters.nansoft_intended_inventorys AS nii ON nii.id = niid.nansoft_intended_inventory_id
+            WHERE niid.id % :step = 0
+            """,
+            {'step': max(round(1 / confirmed_ratio), 1)}
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return {'headers': header_rows, 'details': detail_rows, 'items': item_count}
@@ -1,76 +1,102 @@
 # pages/2_📜_입고_예정_이력.py
 import streamlit as st
-import pandas as pd
-from utils.db_functions import get_history_data
+from datetime import timedelta
+from utils.data_access import get_history_count_view, get_history_page_view, history_page_cursor
+from utils.db_functions import default_since
+from utils.perf import render_debug_panel
 
 # --- 페이지 설정 ---
 st.set_page_config(layout="wide", page_title="입고 예정 이력")
 st.title("📜 입고 예정 이력 조회")
-st.info("전체 입고 예정 품목을 확인하고, 브랜드와 품번으로 필터링할 수 있습니다.")
+st.info("전체 입고 예정 품목을 확인하고, 기간·브랜드·품번으로 필터링할 수 있습니다.")
 
-# --- 데이터 로딩 ---
-@st.cache_data
-def load_history():
-    """DB에서 이력 데이터를 불러옵니다."""
-    df = get_history_data()
-    if not df.empty and '입고예정일' in df.columns:
-        df['입고예정일'] = pd.to_datetime(df['입고예정일']).dt.strftime('%Y-%m-%d')
-    return df
+PAGE_SIZE_OPTIONS = [100, 300, 1000]
 
-history_df = load_history()
+# --- 필터링 UI ---
+st.divider()
+col1, col2, col3 = st.columns(3)
 
-if history_df.empty:
-    st.warning("조회할 입고 예정 이력이 없습니다.")
-else:
-    # --- 필터링 UI ---
-    st.divider()
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # ▼▼▼ [수정된 부분] ▼▼▼
-        # 브랜드 필터 옵션을 지정된 값으로 고정
-        brands = ['이퀄베리', '브랜든', '마켓올슨']
-        selected_brand = st.multiselect(
-            "브랜드 선택",
-            options=brands,
-            placeholder="필터링할 브랜드를 선택하세요 (여러 개 선택 가능)"
-        )
-        # ▲▲▲ [수정된 부분] ▲▲▲
+with col1:
+    # 조회 기간 (기본: 최근 7일부터 90일 뒤까지)
+    since = default_since()
+    date_range = st.date_input(
+        "입고예정일 기간",
+        value=(since, since + timedelta(days=97)),
+    )
 
-    with col2:
-        # 품번/품명 검색 필터
-        search_term = st.text_input(
-            "품번 또는 품명으로 검색",
-            placeholder="검색어를 입력하세요..."
-        )
+with col2:
+    # ▼▼▼ [수정된 부분] ▼▼▼
+    # 브랜드 필터 옵션을 지정된 값으로 고정
+    brands = ['이퀄베리', '브랜든', '마켓올슨']
+    selected_brand = st.multiselect(
+        "브랜드 선택",
+        options=brands,
+        placeholder="필터링할 브랜드를 선택하세요 (여러 개 선택 가능)"
+    )
+    # ▲▲▲ [수정된 부분] ▲▲▲
 
-    # --- 데이터 필터링 로직 ---
-    filtered_df = history_df.copy()
-    if selected_brand:
-        # 지정된 브랜드 외 다른 브랜드가 DB에 있을 경우를 대비하여 필터링
-        filtered_df = filtered_df[filtered_df['브랜드'].isin(selected_brand)]
-    else:
-        # 아무것도 선택하지 않으면 지정된 3개 브랜드만 보여줌
-        filtered_df = filtered_df[filtered_df['브랜드'].isin(brands)]
+with col3:
+    # 품번/품명 검색 필터
+    search_term = st.text_input(
+        "품번 또는 품명으로 검색",
+        placeholder="검색어를 입력하세요..."
+    )
 
-    
-    if search_term:
-        filtered_df = filtered_df[
-            filtered_df['품번'].str.contains(search_term, case=False, na=False) |
-            filtered_df['품명'].str.contains(search_term, case=False, na=False)
-        ]
+if len(date_range) != 2:
+    st.warning("조회 기간의 시작일과 종료일을 모두 선택하세요.")
+    st.stop()
 
-    st.divider()
-    
+start_date, end_date = date_range
+end_date = end_date + timedelta(days=1)  # 종료일 포함
+# 아무것도 선택하지 않으면 지정된 3개 브랜드만 보여줌
+brand_filter = tuple(selected_brand or brands)
+search_term = search_term.strip()
+page_size = st.session_state.get('history_page_size', PAGE_SIZE_OPTIONS[0])
+
+# --- 페이지 상태 (필터가 바뀌면 첫 페이지로) ---
+filter_key = (start_date, end_date, brand_filter, search_term, page_size)
+if st.session_state.get('history_filter_key') != filter_key:
+    st.session_state.history_filter_key = filter_key
+    st.session_state.history_cursors = [None]  # 각 페이지 시작 커서
+
+cursors = st.session_state.history_cursors
+page_no = len(cursors)
+
+# --- 데이터 조회 (DB에서 필터링) ---
+total = get_history_count_view(start_date, end_date, brand_filter, search_term)
+page_df = get_history_page_view(start_date, end_date, brand_filter, search_term, page_size, cursors[-1])
+
+st.divider()
+
+if page_df.empty:
+    st.warning("조회할 입고 예정 이력이 없습니다.")
+else:
     # --- 결과 표시 ---
-    st.markdown(f"**총 {len(filtered_df)}개**의 품목이 조회되었습니다.")
+    first_row = (page_no - 1) * page_size + 1
+    st.markdown(
+        f"**총 {total}개**의 품목이 조회되었습니다. "
+        f"({first_row}~{first_row + len(page_df) - 1}번째)"
+    )
     
     st.dataframe(
-        filtered_df,
+        page_df,
         use_container_width=True,
         hide_index=True,
         column_order=('입고예정일', '브랜드', '품번', '품명', '버전', '예정수량'),
         column_config={
+            "입고예정일": st.column_config.DateColumn(format="YYYY-MM-DD"),
             "예정수량": st.column_config.NumberColumn(format="%d")
         }
     )
+
+# --- 페이지 이동 ---
+nav1, nav2, nav3 = st.columns([1, 1, 4])
+if nav1.button("◀ 이전", disabled=page_no == 1):
+    cursors.pop()
+    st.rerun()
+if nav2.button("다음 ▶", disabled=len(page_df) < page_size):
+    cursors.append(history_page_cursor(page_df))
+    st.rerun()
+nav3.selectbox("페이지당 행 수", PAGE_SIZE_OPTIONS, key='history_page_size')
+
+render_debug_panel()
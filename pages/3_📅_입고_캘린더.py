@@ -1,87 +1,100 @@
 import streamlit as st
-import pandas as pd
-import hashlib
+from datetime import date
 from streamlit_calendar import calendar
-from utils.db_functions import get_history_data
+from utils.data_access import (
+    CALENDAR_MONTH_VIEW, CALENDAR_WEEK_VIEW, calendar_anchor, calendar_visible_range, filter_calendar_rows,
+    get_calendar_search_index, get_calendar_view, get_daily_summary_view, load_calendar_events,
+    load_summary_events, prefetch_calendar_neighbours, shift_calendar_anchor, show_data_age
+)
+from utils.perf import cached_call, render_debug_panel, timed
 
 # --- 페이지 설정 ---
 st.set_page_config(page_title="📅 입고 예정 캘린더", layout="wide")
 st.title("📦 입고 예정 품목 캘린더")
 st.caption("ERP에서 조회한 입고 예정 데이터를 브랜드별로 시각화하고 검색할 수 있습니다.")
 
-# --- 데이터 불러오기 ---
-@st.cache_data
-def load_data():
-    df = get_history_data()
-    if df.empty:
-        return df
-    df["입고예정일"] = pd.to_datetime(df["입고예정일"], errors="coerce")
-    df["예정수량"] = pd.to_numeric(df["예정수량"], errors="coerce").fillna(0).astype(int)
-    df = df.dropna(subset=["입고예정일"])
-    return df
-
-df = load_data()
-if df.empty:
-    st.warning("표시할 입고 예정 데이터가 없습니다.")
-    st.stop()
-
-# --- 사이드바 필터 ---
+# --- 보기 모드 선택 ---
+col1, col2 = st.columns(2)
+view_mode = col1.radio("📅 보기 모드 선택", ["월간 보기", "리스트 보기"], horizontal=True)
+event_mode = col2.radio("🧮 이벤트 단위", ["품목별", "브랜드·일자별 합계"], horizontal=True)
+initial_view = CALENDAR_MONTH_VIEW if view_mode == "월간 보기" else CALENDAR_WEEK_VIEW
+aggregated = event_mode == "브랜드·일자별 합계"
+
+# --- 보이는 기간 이동 (화면에 보이는 기간의 데이터만 불러옵니다) ---
+anchor = calendar_anchor(st.session_state.get('calendar_anchor', date.today()), initial_view)
+nav_prev, nav_today, nav_next, nav_title = st.columns([1, 1, 1, 5])
+if nav_prev.button("◀ 이전"):
+    anchor = shift_calendar_anchor(anchor, initial_view, -1)
+if nav_today.button("오늘"):
+    anchor = calendar_anchor(date.today(), initial_view)
+if nav_next.button("다음 ▶"):
+    anchor = shift_calendar_anchor(anchor, initial_view, 1)
+st.session_state.calendar_anchor = anchor
+range_start, range_end = calendar_visible_range(anchor, initial_view)
+nav_title.markdown(f"#### {anchor:%Y년 %m월}" if initial_view == CALENDAR_MONTH_VIEW else f"#### {anchor:%Y-%m-%d} 주")
+
+# --- 사이드바 필터 (브랜드 목록은 데이터를 읽은 뒤 채웁니다) ---
 with st.sidebar:
     st.header("🔍 필터")
-    brands = sorted(df["브랜드"].dropna().unique())
-    selected_brands = st.multiselect("📦 브랜드 선택", brands, default=brands)
+    brand_filter_slot = st.container()
     search_term = st.text_input("🔎 품명 또는 브랜드 검색", "")
 
-# --- 보기 모드 선택 ---
-view_mode = st.radio("📅 보기 모드 선택", ["월간 보기", "리스트 보기"], horizontal=True)
-initial_view = "dayGridMonth" if view_mode == "월간 보기" else "listWeek"
-
-# --- 데이터 필터링 ---
-filtered_df = df[df["브랜드"].isin(selected_brands)]
-if search_term:
-    mask = (
-        filtered_df["브랜드"].str.contains(search_term, case=False, na=False) |
-        filtered_df["품명"].str.contains(search_term, case=False, na=False)
+# --- 데이터 불러오기 ---
+# 합계 보기는 검색어가 없으면 상세 행 대신 SCM 일별 요약 테이블을 읽습니다 (품명 검색은 상세 행이 필요).
+summary_df = get_daily_summary_view(range_start, range_end) if aggregated and not search_term else None
+use_summary = summary_df is not None
+df = summary_df if use_summary else get_calendar_view(range_start, range_end)
+if df.empty:
+    st.info("이 기간에 표시할 입고 예정 데이터가 없습니다.")
+else:
+    show_data_age(df)
+
+with brand_filter_slot:
+    # 기간마다 브랜드 목록이 달라지므로, 사용자가 뺀 브랜드를 기억해 두고 다른 기간에도 빼 둡니다.
+    hidden_brands = st.session_state.setdefault('calendar_hidden_brands', set())
+    brands = sorted(df["브랜드"].dropna().unique()) if not df.empty else []
+    selected_brands = st.multiselect(
+        "📦 브랜드 선택", brands, default=[b for b in brands if b not in hidden_brands]
+    )
+    st.session_state.calendar_hidden_brands = (hidden_brands - set(brands)) | (set(brands) - set(selected_brands))
+
+# --- 데이터 필터링 및 캘린더 이벤트 생성 (기간·필터 조합별로 캐시) ---
+if df.empty:
+    filtered_df = df
+    events = []
+elif use_summary:
+    filtered_df = filter_calendar_rows(df, selected_brands, '')
+    events = cached_call(
+        'load_summary_events', load_summary_events,
+        range_start, range_end, df.attrs.get('version'), tuple(selected_brands)
+    )
+else:
+    filtered_df = filter_calendar_rows(
+        df, selected_brands, search_term, get_calendar_search_index(df, range_start, range_end)
     )
-    filtered_df = filtered_df[mask]
-
-# --- 브랜드별 색상 지정 ---
-def get_color(brand: str) -> str:
-    if pd.isna(brand):
-        brand = "UNKNOWN"
-    hex_code = hashlib.md5(str(brand).encode()).hexdigest()
-    return f"#{hex_code[:6]}"
-
-# --- 캘린더 이벤트 생성 ---
-events = []
-for _, row in filtered_df.iterrows():
-    version = row.get("버전", "") or ""
-    quantity = f"{row['예정수량']:,}개"
-    title = f"{row['품명']} ({version}) - {quantity}" if version else f"{row['품명']} - {quantity}"
-    start_str = row["입고예정일"].strftime("%Y-%m-%d")
-
-    events.append({
-        "title": title,
-        "start": start_str,
-        "end": start_str,
-        "color": get_color(row["브랜드"]),
-        "extendedProps": {
-            "브랜드": row.get("브랜드", ""),
-            "품번": row.get("품번", ""),
-            "버전": version,
-            "발주번호": row.get("발주번호", "")
-        }
-    })
+    events = cached_call(
+        'load_calendar_events', load_calendar_events,
+        range_start, range_end, df.attrs.get('version'), tuple(selected_brands), search_term, aggregated
+    )
+
+def detail_rows():
+    """드릴다운용 품목 행. 요약 보기에서는 클릭했을 때만 상세 데이터를 읽습니다."""
+    if not use_summary:
+        return filtered_df
+    detail_df = get_calendar_view(range_start, range_end)
+    return filter_calendar_rows(detail_df, selected_brands, '') if not detail_df.empty else detail_df
 
 # --- 캘린더 옵션 설정 ---
 calendar_options = {
     "initialView": initial_view,
+    "initialDate": anchor.isoformat(),
     "locale": "ko",
     "height": 850,
+    # 기간 이동은 위의 버튼으로만 합니다 (이동할 때 그 기간의 데이터를 불러옵니다).
     "headerToolbar": {
-        "left": "prev,next today",
+        "left": "",
         "center": "title",
-        "right": "dayGridMonth,listWeek"
+        "right": ""
     },
     "dayMaxEventRows": True,
     "selectable": True
@@ -89,11 +102,42 @@ calendar_options = {
 
 # --- 캘린더 렌더링 ---
 st.subheader(f"📅 {'월간 보기' if view_mode == '월간 보기' else '리스트 보기'}")
-selected = calendar(events=events, options=calendar_options, key="inbound_calendar")
+with timed('calendar.render', events=len(events)):
+    # 기간/보기가 바뀌면 키가 바뀌어 새 initialDate로 다시 그려집니다.
+    selected = calendar(
+        events=events, options=calendar_options, key=f"inbound_calendar_{initial_view}_{anchor.isoformat()}"
+    )
 
 # --- 선택된 이벤트 처리 ---
+def show_daily_brand_detail(ev: dict):
+    d = ev.get("extendedProps", {})
+    rows = detail_rows()
+    if rows.empty:
+        day_df = rows
+    else:
+        day_df = rows[
+            (rows["입고예정일"].dt.strftime("%Y-%m-%d") == d.get("일자")) &
+            (rows["브랜드"].astype(object).fillna("UNKNOWN") == d.get("브랜드"))
+        ]
+    st.markdown(f"### 🔍 {d.get('일자','')} · {d.get('브랜드','')} 입고 예정 품목")
+    confirmed = f"\n\n✅ **확정 수량:** {d['확정수량']:,}개" if "확정수량" in d else ""
+    st.info(
+        f"**{ev.get('title', '(제목없음)')}**\n\n"
+        f"📄 **발주 수:** {d.get('발주수','')}{confirmed}"
+    )
+    st.dataframe(
+        day_df,
+        use_container_width=True,
+        hide_index=True,
+        column_order=("발주번호", "품번", "품명", "버전", "예정수량"),
+        column_config={"예정수량": st.column_config.NumberColumn(format="%d")}
+    )
+
 def show_event_detail(ev: dict):
     d = ev.get("extendedProps", {})
+    if d.get("집계"):
+        show_daily_brand_detail(ev)
+        return
     st.markdown("### 🔍 선택한 일정 상세")
     st.info(
         f"**{ev.get('title', '(제목없음)')}**\n\n"
@@ -123,8 +167,13 @@ if isinstance(selected, dict) and "callback" in selected:
         st.success(f"{info.get('start','')} ~ {info.get('end','')} (allDay={info.get('allDay')})")
 
 # --- 데이터 테이블 ---
-with st.expander("📋 원본 데이터 보기 (필터 적용됨)"):
+with st.expander("📋 일별 요약 데이터 보기 (필터 적용됨)" if use_summary else "📋 원본 데이터 보기 (필터 적용됨)"):
     st.dataframe(filtered_df)
 
 st.markdown("---")
 st.caption("이 입고 예정 캘린더는 Streamlit Calendar 컴포넌트를 기반으로 구현되었습니다.")
+
+render_debug_panel()
+
+# --- 이웃 기간 미리 읽기 (화면을 다 그린 뒤) ---
+prefetch_calendar_neighbours(anchor, initial_view)
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import text
+
+from benchmarks.standin_db import create_standin_engine, generate
+from utils import db_functions
+from utils.data_access import history_page_cursor
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    generate(tmp_path, 3000)
+    engine = create_standin_engine(tmp_path)
+    monkeypatch.setattr(db_functions, 'init_connection_erp_read', lambda: engine)
+    monkeypatch.setattr(db_functions, 'use_daily_summary', lambda: False)
+    yield engine
+    engine.dispose()
+
+
+def test_keyset_pages_cover_rows_with_null_keys(engine):
+    """발주번호·품명이 NULL인 행이 페이지 마지막에 와도 다음 페이지에서 행이 빠지지 않습니다."""
+    since = db_functions.default_since()
+    until = since + timedelta(days=2)
+    with engine.begin() as conn:
+        ids = [row[0] for row in conn.execute(text(
+            "SELECT id FROM boosters.nansoft_intended_inventorys "
+            "WHERE is_delete = 0 AND intended_push_date >= :since AND intended_push_date < :until ORDER BY id LIMIT 4"
+        ), {'since': since, 'until': until})]
+        conn.execute(text(
+            f"UPDATE boosters.nansoft_intended_inventorys SET po_no = NULL WHERE id IN ({ids[0]}, {ids[1]})"
+        ))
+        conn.execute(text(
+            "UPDATE boosters.nansoft_intended_inventory_details SET product_name = NULL "
+            f"WHERE nansoft_intended_inventory_id IN ({ids[2]}, {ids[3]})"
+        ))
+
+    seen, after = 0, None
+    while not (page := db_functions.fetch_history_page(since, until, limit=1, after=after)).empty:
+        seen += len(page)
+        after = history_page_cursor(page)
+    assert seen == db_functions.count_history_rows(since, until)
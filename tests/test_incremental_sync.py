@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from benchmarks.standin_db import create_standin_engine, generate
+from utils import incremental_sync
+from utils.incremental_sync import _read_state, _local_engine, sync_snapshot
+
+
+@pytest.fixture(scope='module')
+def engine(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('standin')
+    generate(directory, 5000)
+    engine = create_standin_engine(directory)
+    yield engine
+    engine.dispose()
+
+
+def _fresh(engine, since, tmp_path, name):
+    """새 스냅샷에서 since로 한 번 읽은 결과 (기대값)."""
+    return sync_snapshot(engine, since, tmp_path / f'{name}.sqlite')
+
+
+def test_mixed_since_values_return_full_window(engine, tmp_path):
+    """호출마다 since가 달라도(뒤 기간 → 앞 기간) 각 호출은 자기 기간의 행을 모두 받습니다."""
+    today = date.today()
+    shared = tmp_path / 'shared.sqlite'
+    recent, later, earlier = today - timedelta(days=7), today + timedelta(days=20), today - timedelta(days=13)
+
+    first = sync_snapshot(engine, recent, shared)
+    assert first.equals(_fresh(engine, recent, tmp_path, 'recent'))
+
+    assert sync_snapshot(engine, later, shared).equals(_fresh(engine, later, tmp_path, 'later'))
+    assert sync_snapshot(engine, recent, shared).equals(first)
+    assert sync_snapshot(engine, earlier, shared).equals(_fresh(engine, earlier, tmp_path, 'earlier'))
+    assert sync_snapshot(engine, recent, shared).equals(first)
+
+
+def test_covered_since_only_moves_earlier(engine, tmp_path):
+    today = date.today()
+    shared = tmp_path / 'shared.sqlite'
+    sync_snapshot(engine, today - timedelta(days=7), shared)
+    sync_snapshot(engine, today + timedelta(days=20), shared)
+    assert _read_state(_local_engine(str(shared)))['covered_since'] == (today - timedelta(days=7)).isoformat()
+    sync_snapshot(engine, today - timedelta(days=13), shared)
+    assert _read_state(_local_engine(str(shared)))['covered_since'] == (today - timedelta(days=13)).isoformat()
+
+
+def test_decimal_quantities_are_stored(engine, tmp_path, monkeypatch):
+    """MySQL(pymysql)처럼 SUM()이 Decimal로 와도 전체·증분 동기화 모두 스냅샷에 저장됩니다."""
+    since = date.today() - timedelta(days=7)
+    expected = _fresh(engine, since, tmp_path, 'expected')
+
+    def as_decimal(query, *args, **kwargs):
+        df = incremental_sync_run_query(query, *args, **kwargs)
+        if '예정수량' in df.columns:
+            df['예정수량'] = [Decimal(int(value)) for value in df['예정수량']]
+        return df
+
+    incremental_sync_run_query = incremental_sync.run_query
+    monkeypatch.setattr(incremental_sync, 'run_query', as_decimal)
+    shared = tmp_path / 'decimal.sqlite'
+    assert sync_snapshot(engine, since, shared).equals(expected)
+
+    # 헤더 하나의 수정일시를 올려 증분 동기화가 Decimal 행을 다시 쓰게 합니다.
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE boosters.nansoft_intended_inventorys SET updated_at = :now "
+            "WHERE id = (SELECT MIN(id) FROM boosters.nansoft_intended_inventorys WHERE intended_push_date >= :since)"
+        ), {'now': datetime.now() + timedelta(minutes=1), 'since': since})
+    assert sync_snapshot(engine, since, shared).equals(expected)
@@ -0,0 +1,113 @@
+# utils/bulk_import.py
+import codecs
+from datetime import date
+import pandas as pd
+from utils.reconciliation import RECONCILE_KEY_COLUMNS
+from utils.settings import get_setting
+from utils.validation import parse_dates
+
+# 업로드 파일을 이 행 수씩 나눠 읽고 맞춰 봅니다.
+IMPORT_CHUNK_SIZE = 5000
+# 업로드 파일에 꼭 있어야 하는 열 (버전, 유통기한은 없으면 빈 값, 입고일자는 오늘로 채움)
+REQUIRED_COLUMNS = ['발주번호', '품번', 'LOT', '확정수량']
+OPTIONAL_COLUMNS = ['버전', '유통기한', '입고일자']
+# 파일에서 몇 번째 줄인지 (머리글 다음 줄이 2)
+LINE_COLUMN = '파일행'
+
+def _detect_encoding(head):
+    """파일 앞부분으로 인코딩을 고릅니다. UTF-8(BOM 포함)로 읽히지 않으면 엑셀 기본 저장 형식인 CP949로 봅니다."""
+    try:
+        # 잘린 멀티바이트 문자 때문에 실패하지 않도록 final=False로 디코딩합니다.
+        codecs.getincrementaldecoder('utf-8-sig')().decode(head, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp949'
+
+def _csv_chunks(file, chunksize):
+    head = file.read(64 * 1024)
+    file.seek(0)
+    reader = pd.read_csv(
+        file, dtype=str, keep_default_na=False, chunksize=chunksize,
+        encoding=_detect_encoding(head), skipinitialspace=True
+    )
+    with reader:
+        yield from reader
+
+def _excel_chunks(file, chunksize):
+    """첫 시트를 읽기 전용 모드로 한 줄씩 읽어 chunksize 행씩 돌려줍니다 (openpyxl 필요)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else '' for value in next(rows, ())]
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame.from_records(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=header)
+    finally:
+        workbook.close()
+
+def read_upload_chunks(file, name, chunksize=None):
+    """업로드 파일(CSV/XLSX)을 chunksize 행씩 DataFrame으로 나눠 읽는 제너레이터. 파일 행 번호 열을 붙입니다."""
+    chunksize = int(chunksize or get_setting('import_chunksize', IMPORT_CHUNK_SIZE))
+    chunks = _excel_chunks(file, chunksize) if name.lower().endswith(('.xlsx', '.xlsm')) else _csv_chunks(file, chunksize)
+    line = 2
+    for chunk in chunks:
+        chunk.columns = [str(col).strip() for col in chunk.columns]
+        chunk.insert(0, LINE_COLUMN, range(line, line + len(chunk)))
+        line += len(chunk)
+        yield chunk
+
+def _text(series):
+    return series.astype(object).where(series.notna(), '').astype(str).str.strip()
+
+def source_keys(source_df):
+    """예정 데이터를 (발주번호, 품번, 버전)별 한 행으로 줄입니다. 예정수량은 키별 합계입니다."""
+    keys = pd.DataFrame({col: _text(source_df[col]) for col in RECONCILE_KEY_COLUMNS})
+    return (
+        keys.assign(품명=source_df['품명'].astype(object), 예정수량=source_df['예정수량'])
+        .groupby(RECONCILE_KEY_COLUMNS, as_index=False, sort=False)
+        .agg(품명=('품명', 'first'), 예정수량=('예정수량', 'sum'))
+    )
+
+def match_chunk(chunk, keys):
+    """
+    업로드 청크를 예정 키와 한 번의 merge로 맞춰 봅니다. 반환값: (맞은 행, 못 맞춘 행)
+    맞은 행은 편집 리스트와 같은 열(품명, 예정수량 포함)로, 날짜는 YYYY-MM-DD로 맞춥니다.
+    """
+    rows = pd.DataFrame({LINE_COLUMN: chunk[LINE_COLUMN].to_numpy()})
+    for col in REQUIRED_COLUMNS + OPTIONAL_COLUMNS:
+        rows[col] = _text(chunk[col]).to_numpy() if col in chunk.columns else ''
+    rows['입고일자'] = rows['입고일자'].mask(rows['입고일자'] == '', date.today().strftime('%Y-%m-%d'))
+    # 엑셀 날짜 셀(datetime)·YYYYMMDD 등은 YYYY-MM-DD로 바꾸고, 읽을 수 없는 값은 그대로 두어 검증에서 알려 줍니다.
+    for col in ['입고일자', '유통기한']:
+        parsed = parse_dates(rows[col])
+        rows[col] = parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), rows[col])
+    rows['확정수량'] = pd.to_numeric(rows['확정수량'].str.replace(',', ''), errors='coerce')
+
+    merged = rows.merge(keys, on=RECONCILE_KEY_COLUMNS, how='left', indicator=True)
+    found = merged.pop('_merge') == 'both'
+    return merged[found].reset_index(drop=True), merged.loc[~found, rows.columns].reset_index(drop=True)
+
+def import_receiving_file(file, name, source_df, chunksize=None):
+    """
+    업로드 파일을 나눠 읽으며 예정 데이터와 맞춰 봅니다.
+    반환값: (맞은 행 DataFrame, 예정 데이터에 없는 행 DataFrame). 필수 열이 없으면 ValueError입니다.
+    """
+    keys = source_keys(source_df)
+    matched, unmatched = [], []
+    for chunk in read_upload_chunks(file, name, chunksize):
+        missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"필수 열이 없습니다: {', '.join(missing)}")
+        found, not_found = match_chunk(chunk, keys)
+        matched.append(found)
+        unmatched.append(not_found)
+    if not matched:
+        return pd.DataFrame(), pd.DataFrame()
+    return pd.concat(matched, ignore_index=True), pd.concat(unmatched, ignore_index=True)
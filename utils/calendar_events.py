@@ -0,0 +1,103 @@
+# utils/calendar_events.py
+import hashlib
+import pandas as pd
+
+def get_color(brand) -> str:
+    """브랜드 이름의 MD5 앞 6자리로 색상을 정합니다."""
+    if pd.isna(brand):
+        brand = "UNKNOWN"
+    hex_code = hashlib.md5(str(brand).encode()).hexdigest()
+    return f"#{hex_code[:6]}"
+
+def _text(series: pd.Series, default: str = "") -> pd.Series:
+    """category/object 열을 빈 값이 default인 문자열 열로 바꿉니다."""
+    return series.astype(object).fillna(default).astype(str)
+
+def brand_color_map(brands) -> pd.Series:
+    """브랜드 열의 고유값마다 한 번만 색상을 계산해 Series로 돌려줍니다 (브랜드 → 색상)."""
+    unique = _text(pd.Series(brands), "UNKNOWN").unique()
+    return pd.Series({brand: get_color(brand) for brand in unique})
+
+def _colors_for(brands: pd.Series) -> pd.Series:
+    return _text(brands, "UNKNOWN").map(brand_color_map(brands))
+
+def build_item_events(df: pd.DataFrame) -> list:
+    """품목(행)마다 이벤트 하나를 만듭니다. 문자열은 열 단위로 한 번에 조합합니다."""
+    if df.empty:
+        return []
+    brands = df["브랜드"]
+    version = _text(df["버전"])
+    quantity = df["예정수량"].map("{:,}개".format)
+    name = _text(df["품명"])
+    title = name.where(version == "", name + " (" + version + ")") + " - " + quantity
+    start = df["입고예정일"].dt.strftime("%Y-%m-%d")
+    color = _colors_for(brands)
+
+    return [
+        {
+            "title": t,
+            "start": s,
+            "end": s,
+            "color": c,
+            "extendedProps": {"브랜드": b, "품번": p, "버전": v, "발주번호": po},
+        }
+        for t, s, c, b, p, v, po in zip(
+            title, start, color, _text(brands), _text(df["품번"]), version, _text(df["발주번호"])
+        )
+    ]
+
+def _daily_brand_events(daily: pd.DataFrame) -> list:
+    """일자·브랜드별 합계 행(일자, 브랜드, 예정수량, 품목수, 발주수[, 확정수량])을 이벤트로 바꿉니다."""
+    title = (
+        daily["브랜드"].astype(str) + " · " + daily["품목수"].astype(str) + "품목 · "
+        + daily["예정수량"].map("{:,}개".format)
+    )
+    color = _colors_for(daily["브랜드"])
+    confirmed = daily["확정수량"] if "확정수량" in daily.columns else pd.Series(None, index=daily.index)
+
+    return [
+        {
+            "title": t,
+            "start": d,
+            "end": d,
+            "color": c,
+            "extendedProps": {
+                "브랜드": b, "일자": d, "품목수": int(n), "발주수": int(po), "집계": True,
+                **({} if pd.isna(q) else {"확정수량": int(q)}),
+            },
+        }
+        for t, d, c, b, n, po, q in zip(
+            title, daily["일자"], color, daily["브랜드"], daily["품목수"], daily["발주수"], confirmed
+        )
+    ]
+
+def build_daily_brand_events(df: pd.DataFrame) -> list:
+    """브랜드·일자별로 합계 이벤트 하나씩 만듭니다. 클릭하면 해당 일자의 품목으로 드릴다운합니다."""
+    if df.empty:
+        return []
+    daily = (
+        df.assign(브랜드=_text(df["브랜드"], "UNKNOWN"))
+        .groupby([df["입고예정일"].dt.strftime("%Y-%m-%d").rename("일자"), "브랜드"], observed=True)
+        .agg(예정수량=("예정수량", "sum"), 품목수=("품번", "size"), 발주수=("발주번호", "nunique"))
+        .reset_index()
+    )
+    return _daily_brand_events(daily)
+
+def build_summary_events(summary: pd.DataFrame) -> list:
+    """
+    SCM 일별 요약 행(입고예정일·브랜드·발주번호·품번 단위)으로 build_daily_brand_events와 같은 합계 이벤트를 만듭니다.
+    요약 행은 이미 품목 단위로 집계되어 있어 상세 행보다 훨씬 적습니다.
+    """
+    if summary.empty:
+        return []
+    brands = _text(summary["브랜드"], "UNKNOWN").replace("", "UNKNOWN")
+    daily = (
+        summary.assign(브랜드=brands)
+        .groupby([summary["입고예정일"].dt.strftime("%Y-%m-%d").rename("일자"), "브랜드"], observed=True)
+        .agg(
+            예정수량=("예정수량", "sum"), 품목수=("품목수", "sum"),
+            발주수=("발주번호", "nunique"), 확정수량=("확정수량", "sum"),
+        )
+        .reset_index()
+    )
+    return _daily_brand_events(daily)
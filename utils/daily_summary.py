@@ -0,0 +1,347 @@
+# utils/daily_summary.py
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import Index, MetaData, Table, bindparam, text
+
+from utils.incremental_sync import MAX_WATERMARK_QUERY
+from utils.queries import register, run_query
+
+# --- 요약 테이블 설정 ---
+# SCM DB에 두는 일별 입고 예정/확정 요약. 행 키는 (입고예정일, 브랜드, 발주번호, 품번)입니다.
+SUMMARY_TABLE = 'inbound_daily_summary'
+SUMMARY_STATE_TABLE = 'inbound_daily_summary_state'
+SUMMARY_KEY_COLUMNS = ['입고예정일', '브랜드', '발주번호', '품번']
+SUMMARY_COLUMNS = SUMMARY_KEY_COLUMNS + ['예정수량', '확정수량', '품목수', '갱신일시']
+PO_CHUNK_SIZE = 1000
+
+# ERP 집계로 요약을 다시 만드는 refresh_summary는 _summary_lock으로 한 번에 하나만 돌고,
+# 입고 등록 직후의 refresh_confirmed는 SCM 행만 짧게 바꾸므로 이 락을 기다리지 않습니다.
+# 대신 갱신 중에 확정 수량을 다시 계산한 발주번호를 모아 두었다가, 갱신이 이전 확정 수량으로 덮어쓴 행을 다시 맞춥니다.
+_summary_lock = threading.Lock()
+_confirmed_lock = threading.Lock()
+_confirmed_during_refresh = set()
+
+# 요약 테이블 마이그레이션 (migrate_summary_tables가 프로세스마다 처음 한 번 적용, 이미 있으면 그대로 둠).
+# 발주번호 인덱스는 발주번호 단위 조회/삭제(refresh_confirmed, 증분 갱신)가 전체 스캔하지 않게 합니다.
+# MySQL에 직접 적용할 때: CREATE INDEX ix_inbound_daily_summary_po ON scm.inbound_daily_summary (발주번호);
+SUMMARY_PO_INDEX = 'ix_inbound_daily_summary_po'
+SUMMARY_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS scm.{SUMMARY_TABLE} (
+        입고예정일 DATE NOT NULL,
+        브랜드 VARCHAR(100) NOT NULL,
+        발주번호 VARCHAR(100) NOT NULL,
+        품번 VARCHAR(100) NOT NULL,
+        예정수량 INT NOT NULL,
+        확정수량 INT NOT NULL,
+        품목수 INT NOT NULL,
+        갱신일시 DATETIME NOT NULL,
+        PRIMARY KEY (입고예정일, 브랜드, 발주번호, 품번)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS scm.{SUMMARY_STATE_TABLE} (
+        name VARCHAR(50) NOT NULL PRIMARY KEY,
+        value VARCHAR(50) NOT NULL
+    )
+    """,
+]
+
+# ERP 예정 수량을 (입고예정일, 브랜드, 발주번호, 품번) 단위로 집계합니다.
+# 품목수는 기존 조회 결과의 행 단위(품명·버전별) 개수라서 화면의 품목 수와 같습니다.
+PLANNED_QUERY = register('erp.summary_planned', """
+    SELECT
+        t.입고예정일,
+        t.브랜드,
+        t.발주번호,
+        t.품번,
+        SUM(t.예정수량) AS 예정수량,
+        COUNT(*) AS 품목수
+    FROM (
+        SELECT
+            nii.intended_push_date AS 입고예정일,
+            COALESCE(SUBSTRING_INDEX(niid.product_name, '-', 1), '') AS 브랜드,
+            COALESCE(nii.po_no, '') AS 발주번호,
+            COALESCE(niid.product_code, '') AS 품번,
+            SUM(niid.quantity) AS 예정수량
+        FROM
+            boosters.nansoft_intended_inventory_details AS niid
+        JOIN
+            boosters.nansoft_intended_inventorys AS nii
+        ON
+            nii.id = niid.nansoft_intended_inventory_id
+        WHERE
+            nii.intended_push_date >= :since
+            AND nii.is_delete = 0
+            {po_filter}
+        GROUP BY
+            nii.intended_push_date,
+            nii.po_no,
+            niid.product_code,
+            niid.product_name,
+            niid.lot
+    ) AS t
+    GROUP BY
+        t.입고예정일,
+        t.브랜드,
+        t.발주번호,
+        t.품번
+""")
+
+# 워터마크 이후 헤더나 상세가 바뀐 발주번호 (삭제 처리·입고예정일 변경도 헤더 수정일시로 잡힘)
+CHANGED_POS_QUERY = register('erp.changed_pos', """
+    SELECT nii.po_no AS 발주번호
+    FROM boosters.nansoft_intended_inventorys AS nii
+    WHERE nii.{wm} >= :watermark
+    UNION
+    SELECT nii.po_no AS 발주번호
+    FROM boosters.nansoft_intended_inventory_details AS niid
+    JOIN boosters.nansoft_intended_inventorys AS nii ON nii.id = niid.nansoft_intended_inventory_id
+    WHERE niid.{wm} >= :watermark
+""")
+
+CONFIRMED_QUERY = register('scm.summary_confirmed', """
+    SELECT 발주번호, 품번, SUM(확정수량) AS 확정수량
+    FROM scm.input_manage_master
+    WHERE 발주번호 IN :pos
+    GROUP BY 발주번호, 품번
+""", expanding=['pos'])
+
+SUMMARY_ROWS_BY_PO_QUERY = register(
+    'scm.summary_rows_by_po',
+    f"SELECT {', '.join(SUMMARY_KEY_COLUMNS)}, 예정수량, 품목수 FROM scm.{SUMMARY_TABLE} WHERE 발주번호 IN :pos",
+    expanding=['pos']
+)
+
+# 요약 테이블 기간 조회. {select}는 읽을 열, {brand_filter}는 브랜드 조건입니다.
+SUMMARY_RANGE_QUERY = register('scm.summary_range', f"""
+    SELECT {{select}}
+    FROM scm.{SUMMARY_TABLE}
+    WHERE 입고예정일 >= :start_date AND 입고예정일 < :end_date {{brand_filter}}
+""")
+
+
+def _chunks(values):
+    for i in range(0, len(values), PO_CHUNK_SIZE):
+        yield values[i:i + PO_CHUNK_SIZE]
+
+
+def _read_in_chunks(query, engine, pos, params=None, fragments=None):
+    """발주번호 목록을 PO_CHUNK_SIZE씩 나눠 IN 조건으로 조회한 결과를 합칩니다."""
+    expanding = [] if 'pos' in query.expanding else ['pos']
+    frames = [
+        run_query(query, engine, {**(params or {}), 'pos': chunk}, expanding, fragments)
+        for chunk in _chunks(pos)
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+_migrated_engines = set()
+
+
+def migrate_summary_tables(engine_scm):
+    """요약 테이블·상태 테이블·발주번호 인덱스를 만듭니다. 같은 엔진에는 프로세스마다 한 번만 실행합니다."""
+    if id(engine_scm) in _migrated_engines:
+        return
+    with engine_scm.begin() as conn:
+        for ddl in SUMMARY_DDL:
+            conn.execute(text(ddl))
+        table = Table(SUMMARY_TABLE, MetaData(), schema='scm', autoload_with=conn)
+        Index(SUMMARY_PO_INDEX, table.c['발주번호']).create(conn, checkfirst=True)
+    _migrated_engines.add(id(engine_scm))
+
+
+def _read_state(engine_scm):
+    with engine_scm.connect() as conn:
+        rows = conn.execute(text(f"SELECT name, value FROM scm.{SUMMARY_STATE_TABLE}")).all()
+    return {name: value for name, value in rows}
+
+
+def _write_state(conn, state):
+    delete = text(f"DELETE FROM scm.{SUMMARY_STATE_TABLE} WHERE name = :name")
+    insert = text(f"INSERT INTO scm.{SUMMARY_STATE_TABLE} (name, value) VALUES (:name, :value)")
+    for name, value in state.items():
+        conn.execute(delete, {'name': name})
+        conn.execute(insert, {'name': name, 'value': value})
+
+
+def _fetch_planned(engine_erp, since, pos=None):
+    """ERP에서 요약 행의 예정 수량을 조회합니다. pos가 주어지면 해당 발주번호만 조회합니다."""
+    if pos is None:
+        return run_query(PLANNED_QUERY, engine_erp, {'since': since}, fragments={'po_filter': ''})
+    return _read_in_chunks(
+        PLANNED_QUERY, engine_erp, pos, {'since': since}, fragments={'po_filter': 'AND nii.po_no IN :pos'}
+    )
+
+
+def _with_confirmed(engine_scm, rows):
+    """
+    요약 행에 scm.input_manage_master의 확정 수량을 붙입니다.
+    입고 확정 데이터에는 입고예정일이 없으므로, (발주번호, 품번)의 확정 수량은 가장 이른 입고예정일 행에 둡니다.
+    """
+    rows = rows.sort_values(SUMMARY_KEY_COLUMNS, ignore_index=True)
+    pos = sorted(rows['발주번호'].unique().tolist())
+    confirmed = _read_in_chunks(CONFIRMED_QUERY, engine_scm, pos)
+    if confirmed.empty:
+        rows['확정수량'] = 0
+        return rows
+    confirmed = confirmed.astype({'발주번호': str, '품번': str})
+    rows = rows.drop(columns=['확정수량'], errors='ignore').merge(confirmed, on=['발주번호', '품번'], how='left')
+    first = ~rows.duplicated(['발주번호', '품번'])
+    rows['확정수량'] = rows['확정수량'].where(first, 0).fillna(0).astype(int)
+    return rows
+
+
+def _replace_rows(conn, rows, pos=None, since=None):
+    """발주번호(pos)와 기간(since 이후) 조건에 맞는 요약 행을 지우고 rows로 다시 채웁니다."""
+    clauses = []
+    params = {}
+    if since is not None:
+        clauses.append('입고예정일 >= :since')
+        params['since'] = since
+    if pos is None:
+        conn.execute(text(f"DELETE FROM scm.{SUMMARY_TABLE} WHERE {' AND '.join(clauses)}"), params)
+    else:
+        clauses.append('발주번호 IN :pos')
+        delete = text(f"DELETE FROM scm.{SUMMARY_TABLE} WHERE {' AND '.join(clauses)}").bindparams(
+            bindparam('pos', expanding=True)
+        )
+        for chunk in _chunks(pos):
+            conn.execute(delete, {**params, 'pos': chunk})
+    if not rows.empty:
+        rows = rows.assign(갱신일시=datetime.now().replace(microsecond=0))[SUMMARY_COLUMNS]
+        rows.to_sql(SUMMARY_TABLE, con=conn, schema='scm', if_exists='append', index=False, chunksize=PO_CHUNK_SIZE)
+
+
+def _full_refresh(engine_erp, engine_scm, since, watermark_column):
+    """since 이후의 요약 행을 ERP 전체 집계로 다시 만듭니다."""
+    # 조회 전에 워터마크를 잡아 두면, 조회 중 변경된 발주는 다음 증분 갱신에서 다시 집계합니다.
+    watermark = run_query(MAX_WATERMARK_QUERY, engine_erp, fragments={'wm': watermark_column}).iloc[0, 0]
+    rows = _fetch_planned(engine_erp, since)
+    if not rows.empty:
+        rows = _with_confirmed(engine_scm, rows.astype({'발주번호': str, '품번': str}))
+    now = datetime.now().isoformat(timespec='seconds')
+    with engine_scm.begin() as conn:
+        _replace_rows(conn, rows, since=since)
+        _write_state(conn, {
+            'watermark': str(watermark) if pd.notna(watermark) else '',
+            'last_full_refresh': now,
+            'covered_since': pd.Timestamp(since).date().isoformat(),
+            'last_refresh': now,
+        })
+    return len(rows)
+
+
+def _delta_refresh(engine_erp, engine_scm, since, watermark, watermark_column):
+    """워터마크 이후 바뀐 발주번호의 요약 행만 다시 집계합니다."""
+    new_watermark = run_query(MAX_WATERMARK_QUERY, engine_erp, fragments={'wm': watermark_column}).iloc[0, 0]
+    changed = run_query(CHANGED_POS_QUERY, engine_erp, {'watermark': watermark}, fragments={'wm': watermark_column})
+    pos = sorted(changed['발주번호'].dropna().astype(str).unique().tolist())
+    rows = pd.DataFrame()
+    if pos:
+        rows = _fetch_planned(engine_erp, since, pos)
+        if not rows.empty:
+            rows = _with_confirmed(engine_scm, rows.astype({'발주번호': str, '품번': str}))
+    with engine_scm.begin() as conn:
+        if pos:
+            _replace_rows(conn, rows, pos=pos, since=since)
+        state = {'last_refresh': datetime.now().isoformat(timespec='seconds')}
+        if pd.notna(new_watermark):
+            state['watermark'] = str(new_watermark)
+        _write_state(conn, state)
+    return len(pos)
+
+
+def refresh_summary(engine_erp, engine_scm, since, watermark_column='updated_at', full_refresh_hours=24,
+                    min_interval=60):
+    """
+    SCM의 일별 요약 테이블을 ERP 변경분에 맞춰 갱신하고, 갱신 종류와 처리 건수를 반환합니다.
+
+    요약이 없거나 마지막 전체 갱신이 full_refresh_hours보다 오래되면 since 이후를 전체 집계하고,
+    그 외에는 워터마크 이후 바뀐 발주번호만 다시 집계합니다. 마지막 갱신이 min_interval초 안이면 건너뜁니다.
+    """
+    with _summary_lock:
+        migrate_summary_tables(engine_scm)
+        state = _read_state(engine_scm)
+        now = datetime.now()
+        last_full = state.get('last_full_refresh')
+        full = (
+            not state.get('watermark')
+            or not state.get('covered_since')
+            or not last_full
+            or now - datetime.fromisoformat(last_full) > timedelta(hours=full_refresh_hours)
+        )
+        last_refresh = state.get('last_refresh')
+        if not full and last_refresh and now - datetime.fromisoformat(last_refresh) < timedelta(seconds=min_interval):
+            return 'skip', 0
+        with _confirmed_lock:
+            _confirmed_during_refresh.clear()
+        if full:
+            result = 'full', _full_refresh(engine_erp, engine_scm, since, watermark_column)
+        else:
+            result = 'delta', _delta_refresh(engine_erp, engine_scm, since, state['watermark'], watermark_column)
+        # 갱신하는 동안 입고 등록으로 바뀐 발주번호는 갱신이 읽어 둔 이전 확정 수량을 다시 계산합니다.
+        with _confirmed_lock:
+            pos = sorted(_confirmed_during_refresh)
+            _confirmed_during_refresh.clear()
+        _recompute_confirmed(engine_scm, pos)
+        return result
+
+
+def _recompute_confirmed(engine_scm, pos):
+    """발주번호(pos)의 요약 행을 SCM에서 읽어 확정 수량을 다시 붙여 씁니다."""
+    if not pos:
+        return 0
+    rows = _read_in_chunks(SUMMARY_ROWS_BY_PO_QUERY, engine_scm, pos)
+    if rows.empty:
+        return 0
+    rows = _with_confirmed(engine_scm, rows)
+    with engine_scm.begin() as conn:
+        _replace_rows(conn, rows, pos=pos)
+    return len(rows)
+
+
+def refresh_confirmed(engine_scm, pos):
+    """
+    입고 확정 데이터가 바뀐 발주번호(pos)의 요약 행 확정 수량만 다시 계산합니다 (ERP 조회 없음).
+    SCM 행만 짧게 바꾸므로 백그라운드의 요약 갱신(refresh_summary)이 끝나기를 기다리지 않습니다.
+    """
+    pos = sorted({str(po) for po in pos if pd.notna(po)})
+    if not pos:
+        return 0
+    with _confirmed_lock:
+        _confirmed_during_refresh.update(pos)
+    return _recompute_confirmed(engine_scm, pos)
+
+
+def summary_covered_since(engine_scm):
+    """요약 테이블이 담고 있는 가장 이른 입고예정일 (마지막 전체 갱신의 시작일). 갱신된 적이 없으면 None."""
+    covered = _read_state(engine_scm).get('covered_since')
+    return datetime.fromisoformat(covered).date() if covered else None
+
+
+def _summary_query(engine_scm, select, start_date, end_date, brands=None):
+    """요약 테이블의 [start_date, end_date) 기간(선택 브랜드) 조건으로 select 열을 조회합니다."""
+    params = {'start_date': start_date, 'end_date': end_date}
+    if not brands:
+        return run_query(SUMMARY_RANGE_QUERY, engine_scm, params, fragments={'select': select, 'brand_filter': ''})
+    params['brands'] = list(brands)
+    return run_query(
+        SUMMARY_RANGE_QUERY, engine_scm, params, ['brands'],
+        fragments={'select': select, 'brand_filter': 'AND 브랜드 IN :brands'}
+    )
+
+
+def read_summary(engine_scm, start_date, end_date, brands=None):
+    """[start_date, end_date) 기간의 요약 행을 읽습니다. brands가 있으면 해당 브랜드만 읽습니다."""
+    return _summary_query(
+        engine_scm, f"{', '.join(SUMMARY_KEY_COLUMNS)}, 예정수량, 확정수량, 품목수", start_date, end_date, brands
+    )
+
+
+def count_summary_items(engine_scm, start_date, end_date, brands=None):
+    """read_summary와 같은 조건의 품목 행 수 합계 (입고 예정 이력의 전체 건수와 같음)."""
+    totals = _summary_query(engine_scm, "COALESCE(SUM(품목수), 0) AS 품목수", start_date, end_date, brands)
+    return int(totals.iloc[0, 0])
@@ -0,0 +1,547 @@
+# utils/data_access.py
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+import streamlit as st
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from utils.calendar_events import build_daily_brand_events, build_item_events, build_summary_events
+from utils.search_index import build_search_index, search_positions
+from utils.db_functions import (
+    HISTORY_KEYSET_COLUMNS, count_history_rows, default_since, fetch_history_page, fetch_received_quantities,
+    query_daily_summary, refresh_daily_summary,
+    query_intended_inventory, run_with_retry, stream_intended_inventory, use_daily_summary, use_incremental_sync
+)
+from utils.perf import cached_call, mark_cache_miss, record, timed
+from utils.reconciliation import over_receipt, reconcile
+from utils.refresher import start_refresher
+from utils.shared_cache import date_tags, invalidate, po_tags, scm_tags, shared_call, shared_generation
+from utils.validation import validate_submission
+from utils.settings import get_setting
+
+# 입고 예정 데이터 캐시 유지 시간(초)
+DATA_CACHE_TTL = get_setting('data_cache_ttl', 600)
+# 백그라운드 갱신 주기(초). 0이면 백그라운드 갱신 없이 캐시 TTL만 씁니다.
+REFRESH_INTERVAL = get_setting('background_refresh_interval', 300)
+# 일별 요약 캐시 유지 시간(초). 요약 행은 적어서 짧게 두고 자주 다시 읽습니다.
+SUMMARY_CACHE_TTL = get_setting('summary_cache_ttl', 60)
+
+# 값 종류가 적어 category로 저장하는 열
+CATEGORY_COLUMNS = ['브랜드', '품번', '품명', '버전', '발주번호']
+
+def compact_schema(df):
+    """
+    캐시에 넣기 전에 열 타입을 줄입니다: 문자열 열은 category, 예정수량은 int32, 입고예정일은 datetime64.
+    st.cache_data는 세션마다 결과를 복사하므로 작을수록 캐시 조회가 빠릅니다.
+    날짜 문자열 등 표시용 형식은 화면에서만 만듭니다 (to_display_frame).
+    """
+    if '입고예정일' in df.columns:
+        df['입고예정일'] = pd.to_datetime(df['입고예정일'], errors='coerce').astype('datetime64[ns]')
+    if '예정수량' in df.columns:
+        df['예정수량'] = pd.to_numeric(df['예정수량'], errors='coerce').fillna(0).astype('int32')
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+def to_display_frame(df):
+    """AgGrid 등 JSON으로 넘기는 화면용 사본: category는 문자열, 입고예정일은 'YYYY-MM-DD'."""
+    view = df.copy()
+    with timed('view.display_frame', rows=len(view)):
+        for col in view.columns:
+            if isinstance(view[col].dtype, pd.CategoricalDtype):
+                view[col] = view[col].astype(object)
+        if '입고예정일' in view.columns:
+            view['입고예정일'] = view['입고예정일'].dt.strftime('%Y-%m-%d')
+    return view
+
+# ERP 조회 방식: buffered(한 번에 읽기), stream(server-side cursor로 청크를 읽어 바로 압축),
+# parquet(청크를 디스크 Parquet 스냅샷에 쓰고 Arrow로 읽기)
+ERP_READ_MODE = get_setting('erp_read_mode', 'buffered')
+PARQUET_DIR = get_setting('parquet_snapshot_dir', '.cache')
+
+def fold_compact_chunks(chunks):
+    """청크마다 compact_schema를 적용한 뒤 category를 합쳐 하나의 DataFrame으로 만듭니다."""
+    frames = [compact_schema(chunk) for chunk in chunks]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) > 1:
+        for col in CATEGORY_COLUMNS:
+            if col in frames[0].columns:
+                categories = union_categoricals([frame[col] for frame in frames]).categories
+                for frame in frames:
+                    frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+def _inbound_arrow_schema():
+    """입고 예정 Parquet 스냅샷의 고정 스키마. 청크마다 빈 열이 있어도 타입이 흔들리지 않게 합니다."""
+    import pyarrow as pa
+
+    return pa.schema([
+        ('브랜드', pa.string()), ('입고예정일', pa.timestamp('ms')), ('발주번호', pa.string()),
+        ('품번', pa.string()), ('품명', pa.string()), ('버전', pa.string()), ('예정수량', pa.float64()),
+    ])
+
+def stream_to_parquet(chunks, path):
+    """청크를 Parquet 파일 하나로 이어 씁니다. 다 쓴 뒤에 파일을 바꿔 끼우므로 읽는 쪽은 완성된 파일만 봅니다."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _inbound_arrow_schema()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    writer = None
+    try:
+        for chunk in chunks:
+            chunk = chunk.assign(
+                입고예정일=pd.to_datetime(chunk['입고예정일'], errors='coerce'),
+                예정수량=pd.to_numeric(chunk['예정수량'], errors='coerce'),
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk[schema.names], schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+def _read_inbound_frame(since, until=None):
+    """ERP에서 입고 예정 데이터를 읽고 조회 시각(attrs['loaded_at'])을 붙입니다. 공유 캐시에 함께 저장됩니다."""
+    loaded_at = time.time()
+    df = _query_inbound_frame(since, until)
+    df.attrs['loaded_at'] = loaded_at
+    return df
+
+def _query_inbound_frame(since, until=None):
+    if use_incremental_sync() or ERP_READ_MODE == 'buffered':
+        return query_intended_inventory(since, until)
+    with timed('erp.stream_intended_inventory', mode=ERP_READ_MODE) as info:
+        if ERP_READ_MODE == 'parquet':
+            path = Path(PARQUET_DIR) / f"inbound_{since}_{until or 'open'}.parquet"
+            written = run_with_retry(lambda: stream_to_parquet(stream_intended_inventory(since, until), path))
+            df = pd.read_parquet(path) if written else pd.DataFrame()
+        else:
+            df = run_with_retry(lambda: fold_compact_chunks(stream_intended_inventory(since, until)))
+        info['rows'] = len(df)
+    return df
+
+def read_inbound_frame(since, until=None, ttl=DATA_CACHE_TTL):
+    """
+    ERP_READ_MODE에 따라 입고 예정 데이터를 읽습니다. 오류는 호출한 쪽으로 전달합니다.
+    결과는 기간의 월 태그를 붙여 ttl초 동안 공유 캐시에 두므로, 다른 프로세스가 먼저 읽었으면 ERP를 다시 조회하지 않습니다.
+    """
+    return shared_call(
+        'inbound_frame', _read_inbound_frame, (since, until), tags=date_tags(since, until), ttl=ttl
+    )
+
+def _prepare_inbound_dataset(df):
+    """
+    조회 결과를 캐시용 형태로 바꾸고 조회 시점을 기록합니다.
+    공유 캐시에서 읽은 결과는 처음 DB에서 읽은 시각(attrs['loaded_at'])을 그대로 씁니다.
+    """
+    loaded_at = df.attrs.get('loaded_at', time.time())
+    if not df.empty:
+        with timed('normalize.inbound_dataset', rows=len(df)):
+            df = compact_schema(df)
+    # 조회 시점 토큰(version)과 시각(loaded_at). 색인 캐시 키와 데이터 기준 시각 표시에 씁니다.
+    # version은 DB에서 읽은 시각으로 만들므로, 같은 조회 결과를 공유 캐시에서 다시 받으면 version도 같아
+    # 프로세스마다 색인·이벤트 캐시를 다시 만들지 않습니다.
+    df.attrs['version'] = int(loaded_at * 1e9)
+    df.attrs['loaded_at'] = loaded_at
+    return df
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner="입고 예정 데이터를 불러오는 중입니다...")
+def load_inbound_dataset(since, until=None, generation=0):
+    """
+    [since, until) 기간의 입고 예정 데이터를 한 번 조회해 캐시합니다.
+    모든 페이지가 이 결과를 공유하며, 페이지별 가공은 아래 view 함수에서 합니다.
+    generation(공유 캐시 세대 번호)은 캐시 키로만 씁니다. 다른 프로세스에서 무효화하면 값이 바뀌어 다시 읽습니다.
+    """
+    mark_cache_miss('load_inbound_dataset')
+    try:
+        df = read_inbound_frame(since, until)
+    except Exception as e:
+        st.error(f"입고 예정 데이터 조회 오류: {e}")
+        df = pd.DataFrame()
+    return _prepare_inbound_dataset(df)
+
+@st.cache_resource
+def get_inbound_refresher():
+    """프로세스에 하나만 있는 입고 예정 데이터 백그라운드 갱신기 (키: (조회 시작일, 종료일))."""
+    # 공유 캐시 항목이 갱신 주기보다 오래 남으면 갱신해도 같은 스냅샷을 다시 받으므로 TTL을 주기에 맞춥니다.
+    ttl = min(DATA_CACHE_TTL, REFRESH_INTERVAL)
+    return start_refresher(
+        lambda key: _prepare_inbound_dataset(read_inbound_frame(*key, ttl=ttl)),
+        interval=REFRESH_INTERVAL,
+        name='inbound-dataset-refresher',
+    )
+
+def get_inbound_dataset(since, until=None):
+    """
+    [since, until) 기간의 입고 예정 데이터. 백그라운드 갱신을 쓰면 현재 스냅샷을 기다림 없이 돌려주고,
+    아니면 캐시(load_inbound_dataset)에서 읽습니다. 스냅샷은 여러 세션이 함께 쓰므로 수정하지 마세요.
+    """
+    if not REFRESH_INTERVAL:
+        return cached_call(
+            'load_inbound_dataset', load_inbound_dataset, since, until, shared_generation(date_tags(since, until))
+        )
+    try:
+        df, loaded_at = get_inbound_refresher().get((since, until))
+    except Exception as e:
+        st.error(f"입고 예정 데이터 조회 오류: {e}")
+        return _prepare_inbound_dataset(pd.DataFrame())
+    record('snapshot.inbound_dataset', rows=len(df), age_s=round(time.time() - loaded_at, 1))
+    return df
+
+def prefetch_inbound_dataset(since, until=None):
+    """
+    곧 볼 가능성이 높은 기간(예: 캘린더의 이웃 달)을 미리 읽어 둡니다.
+    백그라운드 갱신을 쓰면 별도 스레드에서 읽고, 아니면 화면을 다 그린 뒤 캐시에 채웁니다.
+    """
+    if REFRESH_INTERVAL:
+        get_inbound_refresher().prefetch((since, until))
+        return
+    with timed('prefetch.inbound_dataset', since=str(since), until=str(until)):
+        load_inbound_dataset(since, until, shared_generation(date_tags(since, until)))
+
+def invalidate_inbound_data(pos=None, dates=None):
+    """
+    입고 등록 등으로 바뀐 발주번호(pos)와 입고예정일(dates)의 캐시만 무효화합니다. 둘 다 없으면 전체입니다.
+    입고 등록은 SCM만 바꾸므로 SCM에서 읽은 항목(입고 확정 수량, 일별 요약)의 태그만 올리고,
+    ERP 입고 예정 데이터와 백그라운드 스냅샷은 그대로 둡니다. 다른 프로세스도 세대 번호로 그 항목만 다시 읽고,
+    프로세스별 캐시는 세대 번호가 키에 들어 있어 따로 비우지 않습니다.
+    전체 무효화는 ERP 데이터도 포함하며, 백그라운드 갱신을 쓰면 스냅샷 갱신도 요청합니다 (기존 스냅샷은 계속 제공).
+    """
+    if pos is None and dates is None:
+        invalidate()
+        if REFRESH_INTERVAL:
+            get_inbound_refresher().request_refresh()
+        return
+    tags = []
+    if pos is not None:
+        tags += po_tags(pos)
+    if dates is not None:
+        months = pd.to_datetime(pd.Series(list(dates)), errors='coerce').dropna().dt.strftime('%Y-%m').unique()
+        tags += [f"date:{month}" for month in sorted(months)]
+    if tags:
+        invalidate(scm_tags(tags))
+
+def show_data_age(df):
+    """데이터를 읽은 시각과 경과 시간을 캡션으로 표시합니다."""
+    loaded_at = df.attrs.get('loaded_at')
+    if loaded_at is None:
+        return
+    age_min = int((time.time() - loaded_at) // 60)
+    age_text = "방금" if age_min < 1 else f"{age_min}분 전"
+    st.caption(f"🕒 데이터 기준 시각: {time.strftime('%H:%M:%S', time.localtime(loaded_at))} ({age_text})")
+
+def get_source_view():
+    """입고 등록 페이지용: 최근 조회 기간의 데이터 (compact_schema 타입 그대로)."""
+    return get_inbound_dataset(default_since())
+
+def build_selector_index(df):
+    """
+    연쇄 선택 UI용 색인을 만듭니다.
+    brands: 브랜드 → {'parts': 품번 → '품번 (품명)' 라벨(라벨순), 'pos': 품번 → 발주번호 목록}
+    po_rows: 발주번호 → 행 위치 목록
+    """
+    index = {'brands': {}, 'po_rows': {}}
+    if df.empty:
+        return index
+
+    labels = (
+        df[['브랜드', '품번', '품명']].drop_duplicates()
+        .assign(label=lambda x: x['품번'].astype(str) + ' (' + x['품명'].astype(str) + ')')
+        .groupby(['브랜드', '품번'], observed=True)['label'].agg(' / '.join)
+        .sort_values()
+    )
+    pos = df.groupby(['브랜드', '품번'], observed=True)['발주번호'].agg(lambda x: sorted(x.dropna().unique()))
+
+    for (brand, part), label in labels.items():
+        entry = index['brands'].setdefault(brand, {'parts': {}, 'pos': {}})
+        entry['parts'][part] = label
+        entry['pos'][part] = pos[(brand, part)]
+    index['po_rows'] = {po: positions.tolist() for po, positions in df.groupby('발주번호', observed=True).indices.items()}
+    return index
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def load_selector_index(since, version):
+    """get_inbound_dataset(since)로 만든 연쇄 선택 색인을 데이터 시점(version)별로 캐시합니다."""
+    mark_cache_miss('load_selector_index')
+    df = get_inbound_dataset(since)
+    with timed('index.selector', rows=len(df)):
+        index = build_selector_index(df)
+    index['version'] = df.attrs.get('version')
+    return index
+
+def get_source_selector_index(df):
+    """get_source_view()로 받은 df에 대한 연쇄 선택 색인. 다른 시점 데이터로 만들어졌으면 df로 다시 만듭니다."""
+    version = df.attrs.get('version')
+    index = cached_call('load_selector_index', load_selector_index, default_since(), version)
+    if index['version'] != version:
+        index = build_selector_index(df)
+    return index
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def load_received_quantities(pos, generation=0):
+    """
+    발주번호(pos, tuple)의 LOT 단위 입고 확정 수량을 캐시합니다 (공유 캐시 → 프로세스 캐시 순).
+    입고 등록 후에는 등록한 발주번호의 태그만 무효화되므로 그 발주번호만 다시 조회합니다.
+    조회 오류는 캐시하지 않고 호출한 쪽으로 전달합니다.
+    """
+    mark_cache_miss('load_received_quantities')
+    return shared_call(
+        'received', fetch_received_quantities, (pos,), tags=scm_tags(po_tags(pos)), ttl=DATA_CACHE_TTL
+    )
+
+def get_reconciled_rows(df):
+    """
+    입고 예정 행(df)에 입고수량/잔량/입고상태 열을 붙입니다. df의 발주번호들을 한 번에 조회해 merge합니다.
+    입고 확정 데이터를 읽을 수 없으면 df를 그대로 반환합니다. 오류는 캐시 밖에서 처리하므로 다음 실행에서 다시 조회합니다.
+    """
+    if df.empty:
+        return df
+    pos = tuple(sorted(df['발주번호'].dropna().astype(str).unique()))
+    try:
+        received = cached_call(
+            'load_received_quantities', load_received_quantities, pos, shared_generation(scm_tags(po_tags(pos)))
+        )
+    except Exception as e:
+        record('reconcile.fallback', error=str(e))
+        return df
+    with timed('reconcile.rows', rows=len(df)):
+        return reconcile(df, received)
+
+def check_submission(submission_df):
+    """
+    전송 전 검사. (셀 단위 검증 결과, 예정 합계를 넘게 되는 품목)을 반환합니다.
+    전송 직전이라 캐시를 쓰지 않고 입고 확정 수량을 한 번의 조회로 새로 읽어 두 검사에 함께 씁니다.
+    입고 확정 수량을 읽지 못하면 예외를 그대로 올립니다.
+    """
+    pos = submission_df['발주번호'].dropna().astype(str).unique()
+    received = fetch_received_quantities(pos)
+    with timed('validation.submission', rows=len(submission_df)):
+        errors = validate_submission(submission_df, received)
+    with timed('reconcile.over_receipt', rows=len(submission_df)):
+        over_df = over_receipt(submission_df, get_source_view(), received)
+    return errors, over_df
+
+# 캘린더 보기 종류별 화면에 보이는 기간 계산 단위
+CALENDAR_MONTH_VIEW = 'dayGridMonth'
+CALENDAR_WEEK_VIEW = 'listWeek'
+
+def _week_start(day):
+    """day가 속한 주의 일요일 (FullCalendar ko 로캘의 주 시작 요일)."""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+def calendar_anchor(day, view):
+    """보기 종류에 맞춘 기준일: 월간 보기는 그 달 1일, 주간 리스트는 그 주 일요일."""
+    if view == CALENDAR_MONTH_VIEW:
+        return day.replace(day=1)
+    return _week_start(day)
+
+def shift_calendar_anchor(anchor, view, step):
+    """기준일을 step(±1)만큼 한 달 또는 한 주 옮깁니다."""
+    if view == CALENDAR_MONTH_VIEW:
+        month = anchor.month - 1 + step
+        return anchor.replace(year=anchor.year + month // 12, month=month % 12 + 1, day=1)
+    return anchor + timedelta(weeks=step)
+
+def calendar_visible_range(anchor, view):
+    """
+    캘린더에 실제로 그려지는 [start, end) 기간.
+    월간 보기는 앞뒤 달 날짜까지 포함한 6주 격자, 주간 리스트는 그 주 7일입니다.
+    """
+    if view == CALENDAR_MONTH_VIEW:
+        start = _week_start(anchor.replace(day=1))
+        return start, start + timedelta(weeks=6)
+    return anchor, anchor + timedelta(weeks=1)
+
+def prefetch_calendar_neighbours(anchor, view):
+    """지금 보는 달(주)의 앞뒤 기간을 미리 읽어 이전/다음 이동이 바로 그려지게 합니다."""
+    for step in (1, -1):
+        prefetch_inbound_dataset(*calendar_visible_range(shift_calendar_anchor(anchor, view, step), view))
+
+def get_calendar_view(start, end):
+    """입고 예정 캘린더 페이지용: [start, end) 기간에서 입고예정일이 있는 행만 datetime 그대로 반환합니다."""
+    df = get_inbound_dataset(start, end)
+    if df.empty:
+        return df
+    return df.dropna(subset=['입고예정일'])
+
+# 캘린더 검색 대상 열
+CALENDAR_SEARCH_COLUMNS = ['브랜드', '품명']
+
+@st.cache_resource(ttl=DATA_CACHE_TTL, show_spinner=False)
+def load_calendar_search_index(start, end, version):
+    """
+    get_calendar_view(start, end) 행 위치 기준의 브랜드/품명 검색 색인을 캐시합니다.
+    version(데이터 조회 시점)을 키로 써서 데이터와 색인의 행 위치가 항상 일치합니다.
+    읽기 전용이라 세션마다 복사하지 않도록 cache_resource에 둡니다.
+    """
+    df = get_calendar_view(start, end)
+    with timed('index.calendar_search', rows=len(df)):
+        index = build_search_index(df, CALENDAR_SEARCH_COLUMNS)
+    index['version'] = df.attrs.get('version')
+    return index
+
+def get_calendar_search_index(df, start, end):
+    """get_calendar_view(start, end)로 받은 df에 대한 검색 색인. 색인이 다른 시점 데이터로 만들어졌으면 None입니다."""
+    version = df.attrs.get('version')
+    index = load_calendar_search_index(start, end, version)
+    return index if index['version'] == version else None
+
+def filter_calendar_rows(df, brands, search_term, search_index=None):
+    """
+    캘린더 필터: 선택 브랜드이면서 브랜드/품명에 검색어가 포함된 행.
+    search_index(df 기준 색인)가 있으면 전체 행을 훑지 않고 색인에서 찾습니다.
+    """
+    mask = df['브랜드'].isin(brands).to_numpy()
+    if search_term:
+        if search_index is not None:
+            with timed('search.calendar_index', rows=len(df)):
+                matched = np.zeros(len(df), dtype=bool)
+                matched[search_positions(search_index, search_term)] = True
+        else:
+            matched = (
+                df['브랜드'].str.contains(search_term, case=False, na=False, regex=False) |
+                df['품명'].str.contains(search_term, case=False, na=False, regex=False)
+            ).to_numpy()
+        mask &= matched
+    return df[mask]
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def load_calendar_events(start, end, version, brands, search_term, aggregated=False):
+    """
+    보이는 기간 [start, end), 데이터 시점(version), 필터 조합별 캘린더 이벤트 목록을 만들어 캐시합니다.
+    aggregated면 브랜드·일자별 합계 이벤트입니다.
+    """
+    mark_cache_miss('load_calendar_events')
+    df = get_calendar_view(start, end)
+    filtered_df = filter_calendar_rows(df, list(brands), search_term, get_calendar_search_index(df, start, end))
+    with timed('calendar.build_events', rows=len(filtered_df), aggregated=aggregated):
+        if aggregated:
+            return build_daily_brand_events(filtered_df)
+        return build_item_events(filtered_df)
+
+@st.cache_resource
+def get_summary_refresher():
+    """
+    SCM 일별 요약 테이블을 ERP 변경분으로 갱신하는 백그라운드 갱신기 (프로세스에 하나, 키는 'summary' 하나).
+    화면 요청은 갱신을 기다리지 않고 지금 있는 요약 테이블을 읽습니다.
+    """
+    return start_refresher(
+        lambda _key: refresh_daily_summary(),
+        interval=get_setting('summary_refresh_interval', 60),
+        name='daily-summary-refresher',
+    )
+
+def keep_summary_fresh():
+    """요약 테이블을 쓰는 화면에서 부릅니다. 백그라운드 갱신을 시작하거나(처음) 계속 돌게 합니다."""
+    if use_daily_summary():
+        get_summary_refresher().prefetch('summary')
+
+def _read_daily_summary(start, end):
+    """SCM 일별 요약 행을 읽고 조회 시각(attrs['loaded_at'])을 붙입니다. 공유 캐시에 함께 저장됩니다."""
+    loaded_at = time.time()
+    df = query_daily_summary(start, end)
+    df.attrs['loaded_at'] = loaded_at
+    return df
+
+@st.cache_data(ttl=SUMMARY_CACHE_TTL, show_spinner=False)
+def load_daily_summary(start, end, generation=0):
+    """
+    [start, end) 기간의 SCM 일별 요약 행을 캐시합니다 (공유 캐시 → 프로세스 캐시 순).
+    요약 테이블을 쓸 수 없으면 None을 캐시해 TTL 동안은 상세 데이터로 대신 집계하게 합니다.
+    """
+    mark_cache_miss('load_daily_summary')
+    try:
+        df = shared_call(
+            'daily_summary', _read_daily_summary, (start, end), tags=scm_tags(date_tags(start, end)),
+            ttl=SUMMARY_CACHE_TTL
+        )
+    except Exception as e:
+        record('summary.fallback', caller='load_daily_summary', error=str(e))
+        return None
+    return _prepare_inbound_dataset(df)
+
+def get_daily_summary_view(start, end):
+    """캘린더 합계 보기용 일별 요약 행. 요약 테이블을 쓰지 않거나 읽을 수 없으면 None입니다."""
+    if not use_daily_summary():
+        return None
+    keep_summary_fresh()
+    return cached_call(
+        'load_daily_summary', load_daily_summary, start, end, shared_generation(scm_tags(date_tags(start, end)))
+    )
+
+@st.cache_data(ttl=SUMMARY_CACHE_TTL, show_spinner=False)
+def load_summary_events(start, end, version, brands):
+    """일별 요약 행으로 만든 브랜드·일자별 합계 이벤트를 기간·데이터 시점·브랜드 조합별로 캐시합니다."""
+    mark_cache_miss('load_summary_events')
+    summary = get_daily_summary_view(start, end)
+    if summary is None or summary.empty:
+        return []
+    with timed('calendar.build_summary_events', rows=len(summary)):
+        return build_summary_events(summary[summary['브랜드'].isin(brands)])
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def load_history_page(start_date, end_date, brands, search_term, limit, after=None):
+    """
+    이력 한 페이지를 DB에서 필터링해 조회합니다. brands와 after는 캐시 키가 되도록 tuple로 넘깁니다.
+    조회 오류는 캐시하지 않고 호출한 쪽으로 전달합니다.
+    """
+    mark_cache_miss('load_history_page')
+    df = shared_call(
+        'history_page', fetch_history_page, (start_date, end_date, list(brands), search_term, limit, after),
+        tags=date_tags(start_date, end_date), ttl=DATA_CACHE_TTL
+    )
+    if df.empty:
+        return df
+    with timed('normalize.history_page', rows=len(df)):
+        return compact_schema(df)
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def load_history_count(start_date, end_date, brands, search_term):
+    """load_history_page와 같은 조건의 전체 건수를 조회합니다."""
+    mark_cache_miss('load_history_count')
+    return shared_call(
+        'history_count', count_history_rows, (start_date, end_date, list(brands), search_term),
+        tags=date_tags(start_date, end_date), ttl=DATA_CACHE_TTL
+    )
+
+def history_page_cursor(page_df):
+    """페이지 마지막 행에서 다음 페이지 조회용 키셋 커서를 만듭니다."""
+    last = page_df.iloc[-1]
+    return tuple(
+        pd.Timestamp(last[col]).date() if col == '입고예정일' else (None if pd.isna(last[col]) else last[col])
+        for col in HISTORY_KEYSET_COLUMNS
+    )
+
+def get_history_page_view(start_date, end_date, brands, search_term, limit, after=None):
+    """
+    입고 예정 이력 페이지용: 한 페이지 데이터 (compact_schema 타입 그대로).
+    조회 오류는 캐시 밖에서 표시하므로 다른 프로세스나 다음 실행에 빈 결과가 남지 않습니다.
+    """
+    try:
+        return cached_call(
+            'load_history_page', load_history_page, start_date, end_date, tuple(brands), search_term, limit, after
+        )
+    except Exception as e:
+        st.error(f"이력 데이터 조회 오류: {e}")
+        return pd.DataFrame()
+
+def get_history_count_view(start_date, end_date, brands, search_term):
+    """입고 예정 이력 페이지용: 조건에 맞는 전체 건수 (검색어가 없으면 요약 테이블에서 셉니다)."""
+    if not search_term:
+        keep_summary_fresh()
+    try:
+        return cached_call('load_history_count', load_history_count, start_date, end_date, brands, search_term)
+    except Exception as e:
+        st.error(f"이력 건수 조회 오류: {e}")
+        return 0
@@ -1,129 +1,478 @@
 # utils/db_functions.py
+import random
+import time
 import streamlit as st
 import pandas as pd
+from datetime import date, timedelta
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.dialects import mysql, sqlite
+from utils.daily_summary import (
+    count_summary_items, read_summary, refresh_confirmed, refresh_summary, summary_covered_since
+)
+from utils.incremental_sync import sync_snapshot
+from utils.perf import record, timed, timed_function
+from utils.queries import register, run_query, stream_query
+from utils.settings import get_setting
+
+# 조회 기간(일)과 로컬 스냅샷 기본 경로
+LOOKBACK_DAYS = get_setting('lookback_days', 7)
+SNAPSHOT_PATH = '.cache/erp_snapshot.sqlite'
+# 스트리밍 조회 시 한 번에 가져오는 행 수
+STREAM_CHUNK_SIZE = 20000
+# SCM 일별 요약 테이블이 유지하는 기간(일)
+SUMMARY_LOOKBACK_DAYS = get_setting('summary_lookback_days', 180)
+
+# 일시적인 MySQL 오류 코드 (락 대기 초과, 데드락, 연결 끊김 등) - 재시도 대상
+TRANSIENT_MYSQL_ERRORS = {1205, 1213, 2003, 2006, 2013, 2055}
+
+def _engine_options(suffix):
+    """
+    secrets 설정(예: db_pool_size_erp)으로 커넥션 풀과 타임아웃 옵션을 만듭니다.
+    pool_pre_ping/pool_recycle로 MySQL wait_timeout에 끊긴 연결을 재사용하지 않고,
+    세션의 max_execution_time으로 SELECT 문이 오래 걸리면 서버에서 중단합니다.
+    """
+    statement_timeout_ms = int(get_setting(f'db_statement_timeout_ms_{suffix}', 30000))
+    return dict(
+        pool_size=int(get_setting(f'db_pool_size_{suffix}', 5)),
+        max_overflow=int(get_setting(f'db_max_overflow_{suffix}', 10)),
+        pool_timeout=int(get_setting(f'db_pool_timeout_{suffix}', 30)),
+        pool_recycle=int(get_setting(f'db_pool_recycle_{suffix}', 1800)),
+        pool_pre_ping=True,
+        connect_args={
+            'connect_timeout': int(get_setting(f'db_connect_timeout_{suffix}', 10)),
+            'read_timeout': int(get_setting(f'db_read_timeout_{suffix}', 60)),
+            'write_timeout': int(get_setting(f'db_write_timeout_{suffix}', 60)),
+            'init_command': f"SET SESSION max_execution_time = {statement_timeout_ms}",
+        },
+    )
+
+def _create_mysql_engine(suffix, server_key=None, port_key=None):
+    """db_user_{suffix} 등의 secrets로 MySQL 엔진을 만듭니다. server_key로 접속 서버를 바꿀 수 있습니다."""
+    server_key = server_key or f'db_server_{suffix}'
+    port_key = port_key or f'db_port_{suffix}'
+    db_uri = (
+        f"mysql+pymysql://{st.secrets[f'db_user_{suffix}']}:{st.secrets[f'db_password_{suffix}']}"
+        f"@{st.secrets[server_key]}:{st.secrets.get(port_key, 3306)}"
+        f"/{st.secrets[f'db_name_{suffix}']}"
+    )
+    return create_engine(db_uri, **_engine_options(suffix))
 
 @st.cache_resource
 def init_connection_erp():
     """ERP DB(MySQL)에 연결하는 SQLAlchemy 엔진을 생성합니다."""
     try:
-        db_uri = (
-            f"mysql+pymysql://{st.secrets['db_user_erp']}:{st.secrets['db_password_erp']}"
-            f"@{st.secrets['db_server_erp']}:{st.secrets.get('db_port_erp', 3306)}"
-            f"/{st.secrets['db_name_erp']}"
-        )
-        return create_engine(db_uri)
+        return _create_mysql_engine('erp')
     except Exception as e:
         st.error(f"ERP DB 연결 오류: {e}")
         return None
 
+@st.cache_resource
+def init_connection_erp_read():
+    """
+    읽기 전용 ERP 조회에 쓰는 엔진을 생성합니다.
+    secrets에 db_server_erp_replica가 있으면 읽기 복제본으로, 없으면 ERP 기본 엔진으로 연결합니다.
+    """
+    if get_setting('db_server_erp_replica') is None:
+        return init_connection_erp()
+    try:
+        return _create_mysql_engine('erp', 'db_server_erp_replica', 'db_port_erp_replica')
+    except Exception as e:
+        st.error(f"ERP 읽기 복제본 연결 오류: {e}")
+        return init_connection_erp()
+
 @st.cache_resource
 def init_connection_scm():
     """SCM DB(MySQL)에 연결하는 SQLAlchemy 엔진을 생성합니다."""
     try:
-        db_uri = (
-            f"mysql+pymysql://{st.secrets['db_user_scm']}:{st.secrets['db_password_scm']}"
-            f"@{st.secrets['db_server_scm']}:{st.secrets.get('db_port_scm', 3306)}"
-            f"/{st.secrets['db_name_scm']}"
-        )
-        return create_engine(db_uri)
+        return _create_mysql_engine('scm')
     except Exception as e:
         st.error(f"SCM DB 연결 오류: {e}")
         return None
 
+def _is_transient_error(error):
+    """연결 끊김이나 데드락처럼 다시 시도하면 성공할 수 있는 오류인지 판별합니다."""
+    if isinstance(error, DisconnectionError):
+        return True
+    if isinstance(error, DBAPIError):
+        if error.connection_invalidated:
+            return True
+        args = getattr(error.orig, 'args', ())
+        return bool(args) and args[0] in TRANSIENT_MYSQL_ERRORS
+    return False
+
+def run_with_retry(func, *args, **kwargs):
+    """
+    func를 실행하고, 일시적인 DB 오류면 지수 백오프로 db_retry_attempts회까지 다시 시도합니다.
+    쓰기 작업은 재실행해도 결과가 같은 경우(멱등)에만 감싸야 합니다.
+    """
+    attempts = int(get_setting('db_retry_attempts', 3))
+    backoff = float(get_setting('db_retry_backoff', 0.5))
+    for attempt in range(1, attempts + 1):
+        try:
+            return func(*args, **kwargs)
+        except (DBAPIError, DisconnectionError) as e:
+            if attempt == attempts or not _is_transient_error(e):
+                raise
+            time.sleep(backoff * 2 ** (attempt - 1) * (1 + random.random() / 2))
+
+def use_incremental_sync():
+    """secrets의 sync_mode가 'incremental'이면 로컬 스냅샷 증분 동기화를 사용합니다."""
+    return get_setting('sync_mode', 'full') == 'incremental'
+
+def get_incremental_data(engine_erp, since):
+    """로컬 스냅샷을 ERP 변경분으로 갱신한 뒤 since 이후의 데이터를 반환합니다."""
+    with timed('erp.incremental_sync') as info:
+        df = run_with_retry(
+            sync_snapshot,
+            engine_erp,
+            since=since,
+            snapshot_path=get_setting('snapshot_path', SNAPSHOT_PATH),
+            watermark_column=get_setting('sync_watermark_column', 'updated_at'),
+            full_refresh_hours=get_setting('sync_full_refresh_hours', 24),
+            retention_days=get_setting('sync_retention_days', 400),
+        )
+        info['rows'] = len(df)
+    return df
+
+def default_since():
+    """기본 조회 기간의 시작일(오늘 - LOOKBACK_DAYS)을 반환합니다."""
+    return date.today() - timedelta(days=LOOKBACK_DAYS)
+
+# 브랜드는 품명에서 나오므로(품명으로 이미 묶임) GROUP BY에 SUBSTRING_INDEX 식을 넣지 않습니다.
+# is_delete 조건 때문에 헤더가 없는 상세 행은 어차피 빠지므로 내부 조인으로 씁니다.
+INTENDED_INVENTORY_QUERY = register('erp.intended_inventory', """
+    SELECT 
+        SUBSTRING_INDEX(niid.product_name, '-', 1) AS 브랜드,
+        nii.intended_push_date AS 입고예정일,
+        nii.po_no AS 발주번호,
+        niid.product_code AS 품번,
+        niid.product_name AS 품명,
+        niid.lot AS 버전,
+        SUM(niid.quantity) AS 예정수량
+    FROM 
+        boosters.nansoft_intended_inventory_details AS niid
+    JOIN
+        boosters.nansoft_intended_inventorys AS nii 
+    ON
+        nii.id = niid.nansoft_intended_inventory_id
+    WHERE
+        nii.intended_push_date >= :since
+        {until_filter}
+        AND nii.is_delete = 0
+    GROUP BY 
+        nii.intended_push_date,
+        nii.po_no,
+        niid.product_code, 
+        niid.product_name, 
+        niid.lot
+    ORDER BY 
+        nii.intended_push_date, niid.product_name
+""")
+
+def _intended_inventory_query(since, until=None):
+    """INTENDED_INVENTORY_QUERY의 기간 조건 (조건절 조각, 파라미터)를 반환합니다."""
+    params = {'since': since}
+    until_filter = ''
+    if until is not None:
+        until_filter = 'AND nii.intended_push_date < :until'
+        params['until'] = until
+    return {'until_filter': until_filter}, params
+
+@timed_function('erp.fetch_intended_inventory')
+def query_intended_inventory(since, until=None):
+    """
+    ERP DB에서 [since, until) 기간의 입고 예정 데이터를 조회합니다.
+    until이 없으면 since 이후 전체를 조회합니다. 오류는 호출한 쪽으로 그대로 전달합니다.
+    """
+    engine_erp = init_connection_erp_read()
+    if engine_erp is None:
+        raise RuntimeError("ERP DB 연결 없음")
+    if use_incremental_sync():
+        df = get_incremental_data(engine_erp, since)
+        if until is not None and not df.empty:
+            df = df[df['입고예정일'] < pd.Timestamp(until)].reset_index(drop=True)
+        return df
+    fragments, params = _intended_inventory_query(since, until)
+    return run_with_retry(run_query, INTENDED_INVENTORY_QUERY, engine_erp, params, fragments=fragments)
+
+def stream_intended_inventory(since, until=None, chunksize=None):
+    """
+    query_intended_inventory와 같은 결과를 server-side cursor로 chunksize 행씩 읽어 DataFrame을 하나씩 내보냅니다.
+    클라이언트에 전체 결과를 버퍼링하지 않으므로 조회 기간이 길어도 메모리 사용량이 일정합니다.
+    스트리밍은 결과를 다 읽을 때까지 문이 실행 중이므로, 이 연결에서는 세션 max_execution_time을
+    db_stream_timeout_ms_erp(기본 0 = 제한 없음)로 바꿉니다.
+    """
+    engine_erp = init_connection_erp_read()
+    if engine_erp is None:
+        raise RuntimeError("ERP DB 연결 없음")
+    fragments, params = _intended_inventory_query(since, until)
+    chunksize = int(chunksize or get_setting('stream_chunksize', STREAM_CHUNK_SIZE))
+    stream_timeout_ms = int(get_setting('db_stream_timeout_ms_erp', 0))
+    with engine_erp.connect().execution_options(stream_results=True) as conn:
+        if conn.dialect.name != 'mysql':
+            yield from stream_query(INTENDED_INVENTORY_QUERY, conn, params, chunksize, fragments=fragments)
+            return
+        conn.exec_driver_sql(f"SET SESSION max_execution_time = {stream_timeout_ms}")
+        try:
+            yield from stream_query(INTENDED_INVENTORY_QUERY, conn, params, chunksize, fragments=fragments)
+        finally:
+            # 바꾼 세션 설정이 풀의 다른 조회로 넘어가지 않도록 연결을 버립니다 (다음 연결은 init_command로 다시 설정됨).
+            conn.invalidate()
+
+def fetch_intended_inventory(since, until=None):
+    """query_intended_inventory와 같지만, 오류가 나면 화면에 표시하고 빈 DataFrame을 반환합니다."""
+    try:
+        return query_intended_inventory(since, until)
+    except Exception as e:
+        st.error(f"입고 예정 데이터 조회 오류: {e}")
+        return pd.DataFrame()
+
 def get_source_data():
     """ERP DB에서 소스 데이터를 조회합니다."""
-    engine_erp = init_connection_erp()
-    if engine_erp is not None:
-        try:
-            query = """
-                SELECT 
-                    SUBSTRING_INDEX(niid.product_name, '-', 1) AS 브랜드,
-                    nii.intended_push_date AS 입고예정일,
-                    nii.po_no AS 발주번호,
-                    niid.product_code AS 품번,
-                    niid.product_name AS 품명,
-                    niid.lot AS 버전,
-                    SUM(niid.quantity) AS 예정수량
-                FROM 
-                    boosters.nansoft_intended_inventory_details AS niid
-                LEFT JOIN
-                    boosters.nansoft_intended_inventorys AS nii 
-                ON
-                    nii.id = niid.nansoft_intended_inventory_id
-                LEFT JOIN
-                    boosters_erp.erp_items AS ei
-                ON
-                    ei.itemno = niid.product_code
-                WHERE
-                    nii.intended_push_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) 
-                    AND nii.is_delete = 0
-                GROUP BY 
-                    브랜드,
-                    nii.intended_push_date,
-                    nii.po_no,
-                    niid.product_code, 
-                    niid.product_name, 
-                    niid.lot
-                ORDER BY 
-                    nii.intended_push_date, niid.product_name
-            """
-            return pd.read_sql(query, engine_erp)
-        except Exception as e:
-            st.error(f"소스 데이터 조회 오류: {e}")
-            return pd.DataFrame()
-    return pd.DataFrame()
+    return fetch_intended_inventory(default_since())
 
 def get_history_data():
     """ERP DB에서 전체 입고 예정 이력 데이터를 조회합니다."""
-    engine_erp = init_connection_erp()
-    if engine_erp is not None:
+    return fetch_intended_inventory(default_since())
+
+def use_daily_summary():
+    """secrets의 daily_summary가 꺼져 있지 않으면 집계 화면은 SCM 일별 요약 테이블을 읽습니다."""
+    return bool(get_setting('daily_summary', True))
+
+def refresh_daily_summary():
+    """
+    SCM 일별 요약 테이블을 ERP 변경분으로 갱신합니다 (처음이면 테이블부터 만듭니다).
+    ERP 전체 집계가 걸릴 수 있으므로 화면 요청에서 부르지 않고 백그라운드 갱신기(data_access)에서 부릅니다.
+    마지막 갱신 후 summary_refresh_interval초가 지나지 않았으면 DB를 조회하지 않고 건너뜁니다 (여러 프로세스 공통).
+    """
+    engine_erp = init_connection_erp_read()
+    engine_scm = init_connection_scm()
+    if engine_erp is None or engine_scm is None:
+        raise RuntimeError("ERP/SCM DB 연결 없음")
+    with timed('scm.refresh_daily_summary') as info:
+        mode, count = run_with_retry(
+            refresh_summary,
+            engine_erp,
+            engine_scm,
+            since=date.today() - timedelta(days=SUMMARY_LOOKBACK_DAYS),
+            watermark_column=get_setting('sync_watermark_column', 'updated_at'),
+            full_refresh_hours=get_setting('sync_full_refresh_hours', 24),
+            min_interval=get_setting('summary_refresh_interval', 60),
+        )
+        info.update(mode=mode, count=count)
+
+def summary_covers(start_date):
+    """요약 테이블이 start_date부터의 행을 모두 담고 있는지 (summary_lookback_days보다 오래된 기간은 담지 않음)."""
+    covered = run_with_retry(summary_covered_since, init_connection_scm())
+    return covered is not None and pd.Timestamp(start_date).date() >= covered
+
+@timed_function('scm.query_daily_summary')
+def query_daily_summary(start_date, end_date, brands=None):
+    """
+    [start_date, end_date) 기간의 일별 요약 행을 조회합니다 (갱신은 백그라운드에서 합니다). 오류는 호출한 쪽으로 전달합니다.
+    요약 테이블이 담지 않은 기간이면 LookupError입니다 (호출한 쪽은 상세 데이터로 대신 집계).
+    """
+    if not summary_covers(start_date):
+        raise LookupError(f"요약 테이블 범위 밖의 기간입니다: {start_date}")
+    return run_with_retry(read_summary, init_connection_scm(), start_date, end_date, brands)
+
+HISTORY_PAGE_QUERY = register('erp.history_page', """
+    SELECT 
+        SUBSTRING_INDEX(niid.product_name, '-', 1) AS 브랜드,
+        nii.intended_push_date AS 입고예정일,
+        nii.po_no AS 발주번호,
+        niid.product_code AS 품번,
+        niid.product_name AS 품명,
+        niid.lot AS 버전,
+        SUM(niid.quantity) AS 예정수량
+    FROM 
+        boosters.nansoft_intended_inventory_details AS niid
+    JOIN
+        boosters.nansoft_intended_inventorys AS nii 
+    ON
+        nii.id = niid.nansoft_intended_inventory_id
+    WHERE
+        {where}
+    GROUP BY 
+        nii.intended_push_date,
+        nii.po_no,
+        niid.product_code, 
+        niid.product_name, 
+        niid.lot
+    ORDER BY 
+        nii.intended_push_date, COALESCE(niid.product_name, ''), COALESCE(nii.po_no, ''),
+        COALESCE(niid.product_code, ''), COALESCE(niid.lot, '')
+    LIMIT :limit
+""")
+
+HISTORY_COUNT_QUERY = register('erp.history_count', """
+    SELECT COUNT(*) AS 건수
+    FROM (
+        SELECT 1
+        FROM 
+            boosters.nansoft_intended_inventory_details AS niid
+        JOIN
+            boosters.nansoft_intended_inventorys AS nii 
+        ON
+            nii.id = niid.nansoft_intended_inventory_id
+        WHERE
+            {where}
+        GROUP BY 
+            nii.intended_push_date,
+            nii.po_no,
+            niid.product_code, 
+            niid.product_name, 
+            niid.lot
+    ) AS t
+""")
+
+# 키셋 페이지네이션 정렬 키 (HISTORY_PAGE_QUERY의 ORDER BY와 같은 순서).
+# NULL은 행 비교에서 참/거짓이 되지 않아 그 행 뒤가 건너뛰어지므로, 입고예정일 외의 키는 ''로 바꿔 비교합니다.
+HISTORY_KEYSET_COLUMNS = ['입고예정일', '품명', '발주번호', '품번', '버전']
+
+def _history_filters(start_date, end_date, brands, search_term):
+    """
+    이력 조회 조건을 바인딩 파라미터가 있는 WHERE 절로 만듭니다. 기간은 [start_date, end_date)입니다.
+    반환값: (조건 목록, 파라미터, 목록을 받는 파라미터 이름)
+    """
+    clauses = [
+        'nii.is_delete = 0',
+        'nii.intended_push_date >= :start_date',
+        'nii.intended_push_date < :end_date',
+    ]
+    params = {'start_date': start_date, 'end_date': end_date}
+    expanding = []
+    if brands:
+        clauses.append("SUBSTRING_INDEX(niid.product_name, '-', 1) IN :brands")
+        params['brands'] = list(brands)
+        expanding.append('brands')
+    if search_term:
+        # LIKE 와일드카드를 이스케이프해 검색어를 문자 그대로 찾습니다.
+        escaped = search_term.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+        clauses.append(
+            "(niid.product_code LIKE :pattern ESCAPE '!' OR niid.product_name LIKE :pattern ESCAPE '!')"
+        )
+        params['pattern'] = f"%{escaped}%"
+    return clauses, params, expanding
+
+@timed_function('erp.fetch_history_page')
+def fetch_history_page(start_date, end_date, brands=None, search_term='', limit=100, after=None):
+    """
+    조건에 맞는 입고 예정 이력을 DB에서 필터링해 한 페이지만 조회합니다.
+    after는 직전 페이지 마지막 행의 (입고예정일, 품명, 발주번호, 품번, 버전) 값입니다. 오류는 호출한 쪽으로 전달합니다.
+    """
+    engine_erp = init_connection_erp_read()
+    if engine_erp is None:
+        raise RuntimeError("ERP DB 연결 없음")
+    clauses, params, expanding = _history_filters(start_date, end_date, brands, search_term)
+    if after is not None:
+        clauses.append(
+            "(nii.intended_push_date, COALESCE(niid.product_name, ''), COALESCE(nii.po_no, ''), "
+            "COALESCE(niid.product_code, ''), COALESCE(niid.lot, '')) "
+            "> (:after_date, :after_name, :after_po, :after_code, :after_lot)"
+        )
+        after_date, after_name, after_po, after_code, after_lot = after
+        params.update({
+            'after_date': after_date, 'after_name': after_name or '', 'after_po': after_po or '',
+            'after_code': after_code or '', 'after_lot': after_lot or '',
+        })
+    params['limit'] = int(limit)
+    return run_with_retry(
+        run_query, HISTORY_PAGE_QUERY, engine_erp, params, expanding,
+        fragments={'where': '\n        AND '.join(clauses)}
+    )
+
+@timed_function('erp.count_history_rows')
+def count_history_rows(start_date, end_date, brands=None, search_term=''):
+    """
+    fetch_history_page와 같은 조건의 전체 행 수를 조회합니다.
+    검색어가 없으면 ERP 상세 행을 다시 집계하지 않고 SCM 일별 요약 테이블의 품목수를 더합니다.
+    ERP 조회 오류는 호출한 쪽으로 전달합니다.
+    """
+    if not search_term and use_daily_summary():
         try:
-            query = """
-                SELECT 
-                    SUBSTRING_INDEX(niid.product_name, '-', 1) AS 브랜드,
-                    nii.intended_push_date AS 입고예정일,
-                    nii.po_no AS 발주번호,              -- ✅ 추가됨
-                    niid.product_code AS 품번,
-                    niid.product_name AS 품명,
-                    niid.lot AS 버전,
-                    SUM(niid.quantity) AS 예정수량
-                FROM 
-                    boosters.nansoft_intended_inventory_details AS niid
-                LEFT JOIN
-                    boosters.nansoft_intended_inventorys AS nii 
-                ON
-                    nii.id = niid.nansoft_intended_inventory_id
-                LEFT JOIN
-                    boosters_erp.erp_items AS ei
-                ON
-                    ei.itemno = niid.product_code
-                WHERE
-                    nii.intended_push_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-                    AND nii.is_delete = 0 
-                GROUP BY 
-                    브랜드,
-                    nii.intended_push_date,
-                    nii.po_no,                         -- ✅ 추가됨
-                    niid.product_code, 
-                    niid.product_name, 
-                    niid.lot
-                ORDER BY 
-                    nii.intended_push_date, niid.product_name
-            """
-            df = pd.read_sql(query, engine_erp)
-            return df
+            # 요약 테이블이 담지 않은 오래된 기간은 ERP에서 셉니다.
+            if summary_covers(start_date):
+                return run_with_retry(count_summary_items, init_connection_scm(), start_date, end_date, brands)
         except Exception as e:
-            st.error(f"이력 데이터 조회 오류: {e}")
-            return pd.DataFrame()
-    return pd.DataFrame()
+            record('summary.fallback', caller='count_history_rows', error=str(e))
+    engine_erp = init_connection_erp_read()
+    if engine_erp is None:
+        raise RuntimeError("ERP DB 연결 없음")
+    clauses, params, expanding = _history_filters(start_date, end_date, brands, search_term)
+    counts = run_with_retry(
+        run_query, HISTORY_COUNT_QUERY, engine_erp, params, expanding,
+        fragments={'where': '\n            AND '.join(clauses)}
+    )
+    return int(counts.iloc[0, 0])
+
+RECEIVED_QUERY = register('scm.received_quantities', """
+    SELECT 발주번호, 품번, 버전, LOT, SUM(확정수량) AS 입고수량
+    FROM scm.input_manage_master
+    WHERE 발주번호 IN :pos
+    GROUP BY 발주번호, 품번, 버전, LOT
+""", expanding=['pos'])
+# RECEIVED_QUERY 한 번에 넣는 발주번호 수
+RECEIVED_PO_CHUNK_SIZE = 1000
+
+@timed_function('scm.fetch_received_quantities')
+def fetch_received_quantities(pos):
+    """
+    발주번호 목록의 입고 확정 수량을 (발주번호, 품번, 버전, LOT) 단위로 조회합니다.
+    품목마다 따로 조회하지 않고 발주번호를 IN 조건으로 묶어 보냅니다. 오류는 호출한 쪽으로 전달합니다.
+    """
+    engine_scm = init_connection_scm()
+    if engine_scm is None:
+        raise RuntimeError("SCM DB 연결 없음")
+    pos = sorted({str(po) for po in pos if pd.notna(po)})
+    frames = [
+        run_with_retry(run_query, RECEIVED_QUERY, engine_scm, {'pos': pos[i:i + RECEIVED_PO_CHUNK_SIZE]})
+        for i in range(0, len(pos), RECEIVED_PO_CHUNK_SIZE)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=['발주번호', '품번', '버전', 'LOT', '입고수량'])
+    return pd.concat(frames, ignore_index=True)
+
+# scm.input_manage_master의 멱등 키. 같은 키로 다시 전송하면 새 행을 만들지 않고 기존 행을 갱신합니다.
+# UNIQUE 키는 NULL끼리 같다고 보지 않으므로 버전/LOT의 빈 값은 NULL 대신 ''로 저장합니다 (insert_receiving_data).
+# 테이블에 다음 마이그레이션이 적용되어 있어야 합니다 (기존 NULL 행을 ''로 바꾼 뒤 키를 겁니다):
+#   UPDATE scm.input_manage_master SET 버전 = '' WHERE 버전 IS NULL;
+#   UPDATE scm.input_manage_master SET LOT = '' WHERE LOT IS NULL;
+#   ALTER TABLE scm.input_manage_master
+#       MODIFY 버전 VARCHAR(100) NOT NULL DEFAULT '',
+#       MODIFY LOT VARCHAR(100) NOT NULL DEFAULT '',
+#       ADD UNIQUE KEY ux_input_manage_master_receiving (발주번호, 품번, 버전, LOT);
+RECEIVING_KEY_COLUMNS = ['발주번호', '품번', '버전', 'LOT']
+INSERT_CHUNK_SIZE = 500
+
+def _upsert_rows(table, conn, keys, data_iter):
+    """
+    DataFrame.to_sql의 method로 쓰는 다중 행 upsert입니다.
+    청크 하나를 INSERT 한 문장으로 보내고, 멱등 키가 겹치는 행은 갱신합니다.
+    """
+    rows = [dict(zip(keys, row)) for row in data_iter]
+    update_columns = [key for key in keys if key not in RECEIVING_KEY_COLUMNS]
+    dialect = conn.dialect.name
+    if dialect == 'mysql':
+        stmt = mysql.insert(table.table).values(rows)
+        stmt = stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in update_columns})
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(table.table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=RECEIVING_KEY_COLUMNS,
+            set_={col: stmt.excluded[col] for col in update_columns}
+        )
+    else:
+        stmt = table.table.insert().values(rows)
+    return conn.execute(stmt).rowcount
 
 def insert_receiving_data(data_list):
-    """입고 데이터를 SCM DB 테이블에 삽입합니다."""
+    """입고 데이터(행 dict 목록 또는 DataFrame)를 SCM DB 테이블에 삽입합니다."""
     engine_scm = init_connection_scm()
-    if engine_scm is not None and data_list:
+    if engine_scm is not None and len(data_list):
         try:
-            df_to_insert = pd.DataFrame(data_list)
+            df_to_insert = data_list.copy() if isinstance(data_list, pd.DataFrame) else pd.DataFrame(data_list)
             
             df_to_insert.rename(columns={'예정수량': '입고예정수량'}, inplace=True)
             df_to_insert['확정일'] = pd.to_datetime('today').normalize()
@@ -137,11 +486,35 @@ def insert_receiving_data(data_list):
                 if col not in df_to_insert.columns:
                     df_to_insert[col] = None
 
-            df_final = df_to_insert[final_columns]
+            # 멱등 키의 빈 버전/LOT는 ''로 맞춥니다 (NULL이면 같은 행을 다시 보낼 때 새 행이 생김).
+            for col in ['버전', 'LOT']:
+                values = df_to_insert[col].astype(object)
+                df_to_insert[col] = values.where(values.notna(), '').astype(str).str.strip()
+
+            # 같은 전송 안의 중복 키는 마지막 행만 남깁니다.
+            df_final = df_to_insert[final_columns].drop_duplicates(subset=RECEIVING_KEY_COLUMNS, keep='last')
             
-            df_final.to_sql('input_manage_master', con=engine_scm, schema='scm', if_exists='append', index=False)
+            # 한 트랜잭션 안에서 청크 단위 다중 행 upsert로 전송합니다. 실패하면 전체가 롤백됩니다.
+            # upsert라서 일시적 오류로 롤백된 트랜잭션은 그대로 다시 보내도 안전합니다.
+            def write():
+                with engine_scm.begin() as conn:
+                    df_final.to_sql(
+                        'input_manage_master', con=conn, schema='scm', if_exists='append', index=False,
+                        method=_upsert_rows, chunksize=get_setting('insert_chunksize', INSERT_CHUNK_SIZE)
+                    )
+
+            with timed('scm.insert_receiving_data', rows=len(df_final)):
+                run_with_retry(write)
+
+            # 일별 요약 테이블의 확정 수량도 전송한 발주번호만 다시 계산합니다. 실패해도 전송 결과는 그대로입니다.
+            if use_daily_summary():
+                try:
+                    with timed('scm.refresh_confirmed'):
+                        run_with_retry(refresh_confirmed, engine_scm, df_final['발주번호'].unique())
+                except Exception as e:
+                    record('summary.refresh_confirmed', ok=False, error=str(e))
             
-            return True, "데이터 전송 성공"
+            return True, f"데이터 전송 성공 ({len(df_final)}건)"
         except Exception as e:
             return False, str(e)
             
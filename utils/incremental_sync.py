@@ -0,0 +1,207 @@
+# utils/incremental_sync.py
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import bindparam, create_engine, text
+
+from utils.queries import register, run_query
+
+# --- 스냅샷 설정 ---
+SNAPSHOT_TABLE = 'intended_inventory_snapshot'
+STATE_TABLE = 'sync_state'
+GROUP_COLUMNS = ['브랜드', '입고예정일', '발주번호', '품번', '품명', '버전']
+ID_CHUNK_SIZE = 1000
+
+_sync_lock = threading.Lock()
+
+# 헤더/상세 중 워터마크 이후 변경된 행의 예정 ID (is_delete 변경도 헤더의 수정일시로 잡힘)
+CHANGED_IDS_QUERY = register('erp.changed_intended_ids', """
+    SELECT nii.id AS 예정ID, nii.{wm} AS 변경일시
+    FROM boosters.nansoft_intended_inventorys AS nii
+    WHERE nii.{wm} >= :watermark
+    UNION ALL
+    SELECT niid.nansoft_intended_inventory_id AS 예정ID, niid.{wm} AS 변경일시
+    FROM boosters.nansoft_intended_inventory_details AS niid
+    WHERE niid.{wm} >= :watermark
+""")
+
+MAX_WATERMARK_QUERY = register('erp.max_watermark', """
+    SELECT GREATEST(
+        (SELECT MAX(nii.{wm}) FROM boosters.nansoft_intended_inventorys AS nii),
+        (SELECT MAX(niid.{wm}) FROM boosters.nansoft_intended_inventory_details AS niid)
+    ) AS 워터마크
+""")
+
+# 예정 ID 단위로 집계해 두어야 변경된 헤더만 교체할 수 있습니다.
+SNAPSHOT_ROWS_QUERY = register('erp.snapshot_rows', """
+    SELECT
+        nii.id AS 예정ID,
+        SUBSTRING_INDEX(niid.product_name, '-', 1) AS 브랜드,
+        nii.intended_push_date AS 입고예정일,
+        nii.po_no AS 발주번호,
+        niid.product_code AS 품번,
+        niid.product_name AS 품명,
+        niid.lot AS 버전,
+        SUM(niid.quantity) AS 예정수량
+    FROM
+        boosters.nansoft_intended_inventory_details AS niid
+    JOIN
+        boosters.nansoft_intended_inventorys AS nii
+    ON
+        nii.id = niid.nansoft_intended_inventory_id
+    WHERE
+        nii.intended_push_date >= :since
+        AND nii.is_delete = 0
+        {id_filter}
+    GROUP BY
+        nii.id,
+        nii.intended_push_date,
+        nii.po_no,
+        niid.product_code,
+        niid.product_name,
+        niid.lot
+""")
+
+
+@lru_cache(maxsize=None)
+def _local_engine(snapshot_path):
+    """로컬 스냅샷(SQLite) 엔진을 생성합니다."""
+    Path(snapshot_path).parent.mkdir(parents=True, exist_ok=True)
+    return create_engine(f"sqlite:///{snapshot_path}")
+
+
+def _read_state(local):
+    """저장된 동기화 상태(워터마크, 마지막 전체 동기화 시각)를 읽습니다."""
+    with local.connect() as conn:
+        exists = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': STATE_TABLE}
+        ).first()
+        if not exists:
+            return {}
+        rows = conn.execute(text(f"SELECT key, value FROM {STATE_TABLE}")).all()
+    return {key: value for key, value in rows}
+
+
+def _write_state(conn, state):
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (key TEXT PRIMARY KEY, value TEXT)"))
+    for key, value in state.items():
+        conn.execute(
+            text(f"INSERT OR REPLACE INTO {STATE_TABLE} (key, value) VALUES (:key, :value)"),
+            {'key': key, 'value': value}
+        )
+
+
+def _snapshot_types(rows):
+    """
+    SQLite에 쓸 수 있는 타입으로 바꿉니다.
+    MySQL(pymysql)은 SUM() 결과를 decimal.Decimal로 돌려주는데, sqlite3는 Decimal을 저장하지 못합니다.
+    """
+    if '예정수량' in rows.columns:
+        rows['예정수량'] = pd.to_numeric(rows['예정수량'], errors='coerce').fillna(0).astype('int64')
+    return rows
+
+
+def _fetch_rows(engine_erp, since, ids=None):
+    """ERP에서 예정 ID 단위 집계 행을 조회합니다. ids가 주어지면 해당 헤더만 조회합니다."""
+    if ids is None:
+        return _snapshot_types(
+            run_query(SNAPSHOT_ROWS_QUERY, engine_erp, {'since': since}, fragments={'id_filter': ''})
+        )
+
+    frames = [
+        run_query(
+            SNAPSHOT_ROWS_QUERY, engine_erp, {'since': since, 'ids': ids[i:i + ID_CHUNK_SIZE]}, ['ids'],
+            fragments={'id_filter': 'AND nii.id IN :ids'}
+        )
+        for i in range(0, len(ids), ID_CHUNK_SIZE)
+    ]
+    return _snapshot_types(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame()
+
+
+def _full_sync(engine_erp, local, since, watermark_column):
+    """스냅샷을 since 이후의 ERP 전체 조회 결과로 다시 만들고, 스냅샷이 담은 시작일(covered_since)을 기록합니다."""
+    # 조회 전에 워터마크를 잡아 두면, 조회 중 변경된 행은 다음 증분 동기화에서 다시 가져옵니다.
+    watermark = run_query(MAX_WATERMARK_QUERY, engine_erp, fragments={'wm': watermark_column}).iloc[0, 0]
+    rows = _fetch_rows(engine_erp, since)
+    with local.begin() as conn:
+        rows.to_sql(SNAPSHOT_TABLE, con=conn, if_exists='replace', index=False)
+        _write_state(conn, {
+            'watermark': str(watermark) if pd.notna(watermark) else '',
+            'last_full_sync': datetime.now().isoformat(),
+            'covered_since': since.isoformat(),
+        })
+
+
+def _delta_sync(engine_erp, local, since, watermark, watermark_column):
+    """워터마크 이후 변경된 헤더의 행만 다시 조회해 스냅샷에 병합합니다."""
+    changed = run_query(
+        CHANGED_IDS_QUERY, engine_erp, {'watermark': watermark}, fragments={'wm': watermark_column}
+    )
+    if changed.empty:
+        return
+
+    ids = sorted(changed['예정ID'].dropna().astype(int).unique().tolist())
+    rows = _fetch_rows(engine_erp, since, ids)
+    delete_query = text(f"DELETE FROM {SNAPSHOT_TABLE} WHERE 예정ID IN :ids").bindparams(
+        bindparam('ids', expanding=True)
+    )
+    with local.begin() as conn:
+        for i in range(0, len(ids), ID_CHUNK_SIZE):
+            conn.execute(delete_query, {'ids': ids[i:i + ID_CHUNK_SIZE]})
+        if not rows.empty:
+            rows.to_sql(SNAPSHOT_TABLE, con=conn, if_exists='append', index=False)
+        _write_state(conn, {'watermark': str(changed['변경일시'].max())})
+
+
+def _read_snapshot(local, since):
+    """
+    스냅샷에서 조회 기간의 행을 읽어 기존 조회 결과와 같은 형태로 재집계합니다.
+    호출마다 조회 기간이 다르므로 읽을 때는 지우지 않고 WHERE로만 거릅니다.
+    """
+    with local.connect() as conn:
+        df = pd.read_sql(
+            text(f"SELECT * FROM {SNAPSHOT_TABLE} WHERE 입고예정일 >= :since"),
+            conn, params={'since': str(since)}, parse_dates=['입고예정일']
+        )
+    if df.empty:
+        return df.drop(columns=['예정ID'], errors='ignore')
+
+    df = df.groupby(GROUP_COLUMNS, dropna=False, as_index=False)['예정수량'].sum()
+    return df.sort_values(['입고예정일', '품명'], ignore_index=True)
+
+
+def sync_snapshot(engine_erp, since, snapshot_path, watermark_column='updated_at', full_refresh_hours=24,
+                  retention_days=400):
+    """
+    로컬 스냅샷을 ERP와 동기화한 뒤 조회 기간(since 이후)의 집계 데이터를 반환합니다.
+
+    호출하는 쪽마다 since가 다르므로(캘린더 기간, 이웃 기간 미리 읽기, 입고 등록 화면) 스냅샷은
+    지금까지 요청된 가장 이른 시작일(covered_since)부터 담습니다.
+    스냅샷이 없거나, since가 covered_since보다 이르거나, 마지막 전체 동기화가 full_refresh_hours보다
+    오래되면 전체를 다시 조회하고, 그 외에는 워터마크 이후 변경된 헤더만 조회합니다.
+    주기적인 전체 동기화는 오늘 - retention_days보다 오래된 시작일을 이어받지 않으므로 그때 오래된 행이 정리됩니다.
+    상세 행의 물리 삭제는 수정일시가 남지 않으므로 주기적인 전체 동기화에서 반영됩니다.
+    """
+    since = pd.Timestamp(since).date()
+    local = _local_engine(str(snapshot_path))
+    with _sync_lock:
+        state = _read_state(local)
+        last_full_sync = state.get('last_full_sync')
+        covered_since = date.fromisoformat(state['covered_since']) if state.get('covered_since') else None
+        stale = (
+            not state.get('watermark')
+            or not last_full_sync
+            or datetime.now() - datetime.fromisoformat(last_full_sync) > timedelta(hours=full_refresh_hours)
+        )
+        if covered_since is None or since < covered_since:
+            _full_sync(engine_erp, local, min(since, covered_since or since), watermark_column)
+        elif stale:
+            floor = date.today() - timedelta(days=retention_days)
+            _full_sync(engine_erp, local, min(since, max(covered_since, floor)), watermark_column)
+        else:
+            _delta_sync(engine_erp, local, covered_since, state['watermark'], watermark_column)
+        return _read_snapshot(local, since)
@@ -0,0 +1,108 @@
+# utils/perf.py
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+from utils.settings import get_setting
+
+logger = logging.getLogger('input_management.perf')
+
+# 프로세스 단위로 최근 측정 기록만 보관합니다.
+MAX_RECORDS = 1000
+_records = deque(maxlen=MAX_RECORDS)
+_records_lock = threading.Lock()
+_local = threading.local()
+
+def record(stage, **fields):
+    """측정 결과 하나를 기록하고 구조화된 로그(JSON)로 남깁니다."""
+    entry = {'시각': datetime.now().isoformat(timespec='milliseconds'), 'stage': stage, **fields}
+    with _records_lock:
+        _records.append(entry)
+    line = json.dumps(entry, ensure_ascii=False, default=str)
+    logger.info(line)
+    log_path = get_setting('perf_log_path')
+    if log_path:
+        with _records_lock, open(log_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+@contextmanager
+def timed(stage, **fields):
+    """
+    with 블록의 실행 시간(ms)을 stage 이름으로 기록합니다.
+    블록에서 받은 dict에 rows 등을 넣으면 함께 기록됩니다.
+    """
+    info = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        record(stage, elapsed_ms=round((time.perf_counter() - start) * 1000, 2), **info)
+
+def timed_function(stage):
+    """함수 실행 시간을 기록하는 데코레이터입니다. 반환값에 길이가 있으면 rows로 기록합니다."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage) as info:
+                result = func(*args, **kwargs)
+                if hasattr(result, '__len__'):
+                    info['rows'] = len(result)
+                return result
+        return wrapper
+    return decorator
+
+def mark_cache_miss(name):
+    """캐시된 함수 본문에서 호출합니다. 본문은 캐시 미스일 때만 실행되므로 미스 여부를 알 수 있습니다."""
+    misses = getattr(_local, 'cache_misses', None)
+    if misses is not None:
+        misses.add(name)
+
+def cached_call(name, func, *args, **kwargs):
+    """캐시된 함수를 호출하면서 hit/miss와 소요 시간을 기록합니다. 중첩 호출도 각각 기록됩니다."""
+    outer = getattr(_local, 'cache_misses', None)
+    misses = _local.cache_misses = set()
+    try:
+        with timed(f'cache.{name}') as info:
+            result = func(*args, **kwargs)
+            info['hit'] = name not in misses
+            if hasattr(result, '__len__'):
+                info['rows'] = len(result)
+        return result
+    finally:
+        _local.cache_misses = outer
+
+def get_records():
+    """기록된 측정 결과를 DataFrame으로 반환합니다."""
+    with _records_lock:
+        return pd.DataFrame(list(_records))
+
+def debug_enabled():
+    """secrets의 perf_debug가 켜져 있거나 URL에 ?debug=1이 있으면 성능 패널을 표시합니다."""
+    return bool(get_setting('perf_debug', False)) or st.query_params.get('debug') == '1'
+
+def render_debug_panel():
+    """사이드바에 단계별 소요 시간 요약과 최근 측정 기록을 표시합니다."""
+    if not debug_enabled():
+        return
+    records = get_records()
+    with st.sidebar.expander("⏱ 성능 디버그", expanded=False):
+        if records.empty:
+            st.caption("측정 기록이 없습니다.")
+            return
+        summary = records.groupby('stage')['elapsed_ms'].agg(
+            횟수='count', 평균_ms='mean', p95_ms=lambda s: s.quantile(0.95), 최대_ms='max'
+        ).round(1).sort_values('평균_ms', ascending=False)
+        st.dataframe(summary, use_container_width=True)
+        st.dataframe(records.iloc[::-1].head(50), use_container_width=True, hide_index=True)
+        st.download_button(
+            "측정 기록 다운로드 (JSONL)",
+            data=records.to_json(orient='records', lines=True, force_ascii=False),
+            file_name='perf_records.jsonl',
+        )
@@ -0,0 +1,117 @@
+# utils/queries.py
+import logging
+import time
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+from utils.perf import record
+from utils.settings import get_setting
+
+logger = logging.getLogger('input_management.sql')
+
+# 이 시간(ms) 이상 걸린 조회는 느린 쿼리로 SQL·파라미터와 함께 따로 기록합니다.
+SLOW_QUERY_MS = 1000
+
+_registry = {}
+
+class Query:
+    """
+    이름 붙은 SQL. ':이름'은 바인딩 파라미터, '{이름}'은 실행할 때 채우는 조건절 조각입니다.
+    expanding은 목록을 받는(IN :pos) 파라미터 이름입니다.
+    """
+
+    def __init__(self, name, sql, expanding=()):
+        self.name = name
+        self.sql = sql
+        self.expanding = tuple(expanding)
+
+    def statement(self, expanding=(), fragments=None, prefix=''):
+        """실행할 text() 문. expanding은 이번 실행에서만 목록을 받는 파라미터 이름입니다."""
+        sql = self.sql.format(**fragments) if fragments else self.sql
+        stmt = text(prefix + sql)
+        names = [*self.expanding, *expanding]
+        return stmt.bindparams(*[bindparam(name, expanding=True) for name in names]) if names else stmt
+
+    def __repr__(self):
+        return f"Query({self.name!r})"
+
+def register(name, sql, expanding=()):
+    """
+    쿼리를 이름으로 등록하고 반환합니다.
+    같은 이름은 마지막 등록으로 바뀝니다 (Streamlit이 수정된 모듈을 다시 import할 때 그대로 다시 등록됨).
+    """
+    query = _registry[name] = Query(name, sql, expanding)
+    return query
+
+def get_query(name):
+    return _registry[name]
+
+def registered_queries():
+    """등록된 쿼리 목록 (이름순)."""
+    return [_registry[name] for name in sorted(_registry)]
+
+def _resolve(query):
+    return get_query(query) if isinstance(query, str) else query
+
+def _param_summary(params):
+    """로그용 파라미터 요약. 목록 파라미터는 길이만 남깁니다."""
+    return {
+        key: f"<{len(value)}개>" if isinstance(value, (list, tuple)) else value
+        for key, value in (params or {}).items()
+    }
+
+def _log_execution(query, bind, params, expanding, fragments, elapsed_ms, rows):
+    """실행 한 번의 소요 시간과 행 수를 기록하고, 느리면 SQL·파라미터(설정하면 실행 계획도)를 남깁니다."""
+    record(f'sql.{query.name}', elapsed_ms=round(elapsed_ms, 2), rows=rows)
+    threshold = float(get_setting('slow_query_ms', SLOW_QUERY_MS))
+    if elapsed_ms < threshold:
+        return
+    fields = {'name': query.name, 'elapsed_ms': round(elapsed_ms, 2), 'rows': rows, 'params': _param_summary(params)}
+    if get_setting('explain_slow_queries', False):
+        try:
+            fields['plan'] = explain(query, bind, params, expanding, fragments).to_dict('records')
+        except Exception as e:
+            fields['plan_error'] = str(e)
+    logger.warning("느린 쿼리 %s: %.0f ms, %s행", query.name, elapsed_ms, rows)
+    record('sql.slow', sql=query.statement(expanding, fragments).text, **fields)
+
+def run_query(query, bind, params=None, expanding=(), fragments=None):
+    """
+    등록된 쿼리(이름 또는 Query)를 실행해 DataFrame으로 반환합니다.
+    실행마다 소요 시간과 행 수를 'sql.<이름>'으로 기록합니다. 오류는 호출한 쪽으로 그대로 전달합니다.
+    """
+    query = _resolve(query)
+    start = time.perf_counter()
+    df = pd.read_sql(query.statement(expanding, fragments), bind, params=params)
+    _log_execution(query, bind, params, expanding, fragments, (time.perf_counter() - start) * 1000, len(df))
+    return df
+
+def stream_query(query, bind, params=None, chunksize=20000, expanding=(), fragments=None):
+    """run_query와 같지만 chunksize 행씩 DataFrame을 내보냅니다. 다 읽은 뒤 전체 소요 시간과 행 수를 기록합니다."""
+    query = _resolve(query)
+    start = time.perf_counter()
+    rows = 0
+    for chunk in pd.read_sql(query.statement(expanding, fragments), bind, params=params, chunksize=chunksize):
+        rows += len(chunk)
+        yield chunk
+    _log_execution(query, bind, params, expanding, fragments, (time.perf_counter() - start) * 1000, rows)
+
+def explain(query, bind, params=None, expanding=(), fragments=None):
+    """
+    쿼리의 실행 계획을 DataFrame으로 반환합니다 (MySQL: EXPLAIN, SQLite 대체 DB: EXPLAIN QUERY PLAN).
+    '전체스캔' 열은 인덱스 없이 테이블 전체를 읽는 단계를 표시합니다.
+    """
+    query = _resolve(query)
+    sqlite = bind.dialect.name == 'sqlite'
+    plan = pd.read_sql(
+        query.statement(expanding, fragments, prefix='EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '),
+        bind, params=params
+    )
+    if sqlite:
+        # 서브쿼리 결과(CO-ROUTINE/MATERIALIZE)를 읽는 SCAN은 테이블 스캔이 아니므로 빼고 봅니다.
+        derived = plan['detail'].str.extract(r'^(?:CO-ROUTINE|MATERIALIZE) (\S+)$')[0].dropna()
+        scanned = plan['detail'].str.extract(r'^SCAN (\S+)(?: AS \S+)?$')[0]
+        plan['전체스캔'] = scanned.notna() & ~scanned.isin(derived)
+    else:
+        plan['전체스캔'] = plan['type'].eq('ALL')
+    return plan.assign(쿼리=query.name)
@@ -0,0 +1,85 @@
+# utils/reconciliation.py
+import numpy as np
+import pandas as pd
+
+# 입고 예정(ERP)과 입고 확정(scm.input_manage_master)을 맞춰 보는 키
+RECONCILE_KEY_COLUMNS = ['발주번호', '품번', '버전']
+
+def _keys(df: pd.DataFrame) -> pd.DataFrame:
+    """키 열을 빈 값이 ''인 문자열로 맞춥니다 (category/None/NaN 섞임 방지)."""
+    return pd.DataFrame(
+        {col: df[col].astype(object).where(df[col].notna(), '').astype(str) for col in RECONCILE_KEY_COLUMNS},
+        index=df.index,
+    )
+
+def received_totals(received: pd.DataFrame) -> pd.DataFrame:
+    """LOT 단위 입고 확정 수량을 (발주번호, 품번, 버전)별 합계로 줄입니다."""
+    if received.empty:
+        return pd.DataFrame(columns=RECONCILE_KEY_COLUMNS + ['입고수량'])
+    return (
+        _keys(received).assign(입고수량=pd.to_numeric(received['입고수량'], errors='coerce').fillna(0))
+        .groupby(RECONCILE_KEY_COLUMNS, as_index=False)['입고수량'].sum()
+    )
+
+def reconcile(expected: pd.DataFrame, received: pd.DataFrame) -> pd.DataFrame:
+    """
+    입고 예정 행에 키별 예정 합계·입고 수량·잔량·상태 열을 붙입니다. 한 번의 merge로 계산합니다.
+    같은 키의 예정 행이 여러 개(입고예정일/품명 차이)면 예정합계는 그 행들의 합입니다.
+    """
+    keys = _keys(expected)
+    totals = received_totals(received)
+    result = expected.copy()
+    result['예정합계'] = expected['예정수량'].groupby([keys[col] for col in RECONCILE_KEY_COLUMNS]).transform('sum')
+    result['입고수량'] = (
+        pd.to_numeric(keys.merge(totals, on=RECONCILE_KEY_COLUMNS, how='left')['입고수량'])
+        .fillna(0).astype(int).to_numpy()
+    )
+    result['잔량'] = result['예정합계'] - result['입고수량']
+    result['입고상태'] = np.select(
+        [result['입고수량'] == 0, result['잔량'] > 0, result['잔량'] == 0],
+        ['미입고', '부분입고', '입고완료'],
+        default='초과입고',
+    )
+    return result
+
+def over_receipt(submission: pd.DataFrame, expected: pd.DataFrame, received: pd.DataFrame) -> pd.DataFrame:
+    """
+    이번 전송으로 예정 합계를 넘게 되는 (발주번호, 품번, 버전) 목록을 반환합니다.
+    같은 (키, LOT)를 다시 보내면 기존 행을 덮어쓰므로(upsert) 그 LOT의 기존 입고 수량은 빼고 계산합니다.
+    예정 데이터에 없는 키(직접 추가한 행)는 비교하지 않습니다.
+    """
+    columns = RECONCILE_KEY_COLUMNS + ['예정수량', '기입고수량', '이번확정수량', '초과수량']
+    if submission.empty or expected.empty:
+        return pd.DataFrame(columns=columns)
+
+    submitted = _keys(submission).assign(
+        LOT=submission['LOT'].astype(object).where(submission['LOT'].notna(), '').astype(str).str.strip(),
+        이번확정수량=pd.to_numeric(submission['확정수량'], errors='coerce').fillna(0),
+    )
+    if not received.empty:
+        existing = _keys(received).assign(
+            LOT=received['LOT'].astype(object).where(received['LOT'].notna(), '').astype(str).str.strip(),
+            입고수량=received['입고수량'],
+        )
+        # 이번에 다시 보내는 LOT 행은 덮어써지므로 기존 수량에서 뺍니다.
+        existing = existing.merge(
+            submitted[RECONCILE_KEY_COLUMNS + ['LOT']].drop_duplicates(), how='left', indicator=True
+        )
+        existing = existing[existing['_merge'] == 'left_only']
+    else:
+        existing = pd.DataFrame(columns=RECONCILE_KEY_COLUMNS + ['입고수량'])
+
+    planned = (
+        _keys(expected).assign(예정수량=expected['예정수량'])
+        .groupby(RECONCILE_KEY_COLUMNS, as_index=False)['예정수량'].sum()
+    )
+    check = (
+        submitted.groupby(RECONCILE_KEY_COLUMNS, as_index=False)['이번확정수량'].sum()
+        .merge(planned, on=RECONCILE_KEY_COLUMNS, how='inner')
+        .merge(received_totals(existing).rename(columns={'입고수량': '기입고수량'}), on=RECONCILE_KEY_COLUMNS, how='left')
+    )
+    check['기입고수량'] = pd.to_numeric(check['기입고수량']).fillna(0)
+    check['초과수량'] = check['기입고수량'] + check['이번확정수량'] - check['예정수량']
+    return check.loc[check['초과수량'] > 0, columns].astype(
+        {'예정수량': int, '기입고수량': int, '이번확정수량': int, '초과수량': int}
+    ).reset_index(drop=True)
@@ -0,0 +1,131 @@
+# utils/refresher.py
+import logging
+import threading
+import time
+
+from utils.perf import record
+
+logger = logging.getLogger('input_management.refresher')
+
+# 이름별로 지금 돌고 있는 갱신기. 같은 이름으로 새로 만들면 이전 것을 멈춥니다 (start_refresher).
+_active = {}
+_active_lock = threading.Lock()
+
+class SnapshotRefresher:
+    """
+    키(예: 조회 시작일)별 데이터 스냅샷을 백그라운드 스레드에서 주기적으로 다시 읽어 교체합니다.
+
+    get()은 항상 가지고 있는 스냅샷을 바로 돌려주고(stale-while-revalidate),
+    새 스냅샷은 다 읽은 뒤에 참조만 바꿔 끼우므로 읽는 쪽은 DB 조회를 기다리지 않습니다.
+    처음 보는 키만 한 번 직접 읽습니다. 읽기에 실패하면 이전 스냅샷을 유지합니다.
+    stop()을 부르면 갱신 스레드가 끝납니다.
+    """
+
+    def __init__(self, loader, interval, name='snapshot-refresher'):
+        self._loader = loader
+        self._interval = interval
+        self._snapshots = {}     # key → (데이터, 읽은 시각)
+        self._last_access = {}   # key → 마지막 get() 시각
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def get(self, key):
+        """key의 스냅샷과 읽은 시각(epoch 초)을 반환합니다."""
+        with self._lock:
+            self._last_access[key] = time.time()
+            snapshot = self._snapshots.get(key)
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if snapshot is not None:
+            return snapshot
+        # 처음 보는 키: 같은 키를 동시에 여러 세션이 요청해도 한 번만 읽습니다.
+        with key_lock:
+            with self._lock:
+                snapshot = self._snapshots.get(key)
+            return snapshot if snapshot is not None else self._load(key, raise_errors=True)
+
+    def prefetch(self, key):
+        """key의 스냅샷이 없으면 별도 스레드에서 미리 읽어 둡니다. 이미 읽는 중이면 아무것도 하지 않습니다."""
+        with self._lock:
+            self._last_access[key] = time.time()
+            if key in self._snapshots:
+                return
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if not key_lock.acquire(blocking=False):
+            return
+
+        def load():
+            try:
+                with self._lock:
+                    loaded = key in self._snapshots
+                if not loaded:
+                    self._load(key)
+            finally:
+                key_lock.release()
+
+        threading.Thread(target=load, name=f"{self._thread.name}-prefetch", daemon=True).start()
+
+    def request_refresh(self):
+        """다음 주기를 기다리지 않고 곧바로 모든 스냅샷을 다시 읽게 합니다."""
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """갱신 스레드를 멈추고 스냅샷을 비웁니다. 진행 중인 읽기가 있으면 timeout초까지 끝나기를 기다립니다."""
+        self._stopped.set()
+        self._wake.set()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+        with self._lock:
+            self._snapshots.clear()
+            self._last_access.clear()
+
+    def _load(self, key, raise_errors=False):
+        start = time.time()
+        try:
+            data = self._loader(key)
+        except Exception as e:
+            logger.warning("스냅샷 갱신 실패 (%s): %s", key, e)
+            record('refresher.load', key=str(key), ok=False, error=str(e))
+            if raise_errors:
+                raise
+            return None
+        snapshot = (data, time.time())
+        with self._lock:
+            self._snapshots[key] = snapshot
+        record('refresher.load', key=str(key), ok=True, elapsed_ms=round((time.time() - start) * 1000, 2))
+        return snapshot
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            with self._lock:
+                # 한동안 아무도 찾지 않은 키(지난 조회 기간 등)는 버립니다.
+                stale_before = time.time() - 3 * self._interval
+                for key in [k for k, t in self._last_access.items() if t < stale_before]:
+                    self._last_access.pop(key, None)
+                    self._snapshots.pop(key, None)
+                keys = list(self._snapshots)
+            for key in keys:
+                if self._stopped.is_set():
+                    break
+                self._load(key)
+        logger.info("갱신 스레드 종료: %s", self._thread.name)
+
+def start_refresher(loader, interval, name):
+    """
+    name 갱신기를 새로 시작하고, 같은 이름으로 돌던 이전 갱신기는 멈춥니다.
+    cache_resource가 비워지거나 수정된 모듈이 다시 import되어 갱신기를 다시 만들어도 스레드가 쌓이지 않습니다.
+    """
+    refresher = SnapshotRefresher(loader, interval, name)
+    with _active_lock:
+        previous = _active.get(name)
+        _active[name] = refresher
+    if previous is not None:
+        previous.stop(timeout=0)
+    return refresher
@@ -0,0 +1,57 @@
+# utils/search_index.py
+import numpy as np
+import pandas as pd
+
+# 한글 품명은 두 글자 검색이 흔해서 2-gram을 씁니다.
+NGRAM_SIZE = 2
+
+def _ngrams(value, n=NGRAM_SIZE):
+    return {value[i:i + n] for i in range(len(value) - n + 1)}
+
+def build_search_index(df, columns, n=NGRAM_SIZE):
+    """
+    columns의 고유값(소문자 정규화)에 대한 n-gram 역색인을 만듭니다.
+    values: 고유값 목록, rows: 고유값 번호 → 그 값을 가진 행 위치, postings: n-gram → 고유값 번호 배열
+    """
+    row_lists = {}
+    for col in columns:
+        normalized = df[col].astype(object).fillna('').astype(str).str.lower()
+        codes, uniques = pd.factorize(normalized)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for code, value in enumerate(uniques):
+            row_lists.setdefault(value, []).append(order[bounds[code]:bounds[code + 1]])
+
+    values = list(row_lists)
+    rows = [np.unique(np.concatenate(parts)) for parts in row_lists.values()]
+    postings = {}
+    for value_id, value in enumerate(values):
+        for gram in _ngrams(value, n):
+            postings.setdefault(gram, []).append(value_id)
+
+    return {
+        'n': n,
+        'values': values,
+        'rows': rows,
+        'postings': {gram: np.array(ids) for gram, ids in postings.items()},
+    }
+
+def search_positions(index, term):
+    """검색어(대소문자 무시, 부분 문자열)가 포함된 행 위치를 정렬된 배열로 반환합니다."""
+    term = term.strip().lower()
+    values = index['values']
+    if len(term) >= index['n']:
+        candidates = None
+        for gram in _ngrams(term, index['n']):
+            ids = index['postings'].get(gram)
+            if ids is None:
+                return np.array([], dtype=np.intp)
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+    else:
+        candidates = range(len(values))
+
+    # n-gram이 모두 있어도 순서가 다를 수 있으므로 실제 포함 여부를 확인합니다.
+    matched = [index['rows'][i] for i in candidates if term in values[i]]
+    if not matched:
+        return np.array([], dtype=np.intp)
+    return np.unique(np.concatenate(matched))
@@ -0,0 +1,10 @@
+# utils/settings.py
+import streamlit as st
+
+
+def get_setting(key, default=None):
+    """st.secrets에서 설정값을 읽습니다. 값이나 secrets 파일이 없으면 기본값을 반환합니다."""
+    try:
+        return st.secrets.get(key, default)
+    except FileNotFoundError:
+        return default
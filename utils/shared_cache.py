@@ -0,0 +1,237 @@
+# utils/shared_cache.py
+import hashlib
+import io
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+from utils.perf import record
+from utils.settings import get_setting
+
+# 여러 프로세스(Streamlit 복제본)가 함께 쓰는 데이터 계층 캐시.
+# disk: 같은 서버의 프로세스끼리 로컬 디스크(Parquet)로 공유, redis: 서버가 여러 대일 때 Redis로 공유, none: 끔
+CACHE_BACKEND = get_setting('shared_cache_backend', 'disk')
+CACHE_DIR = get_setting('shared_cache_dir', '.cache/shared')
+# 열린 기간(종료일 없음) 조회에 붙이는 월 태그 범위(일)
+OPEN_RANGE_DAYS = 400
+# 모든 입고 예정 캐시에 붙는 태그. 이 태그를 무효화하면 전체를 다시 읽습니다.
+ALL_TAG = 'inbound'
+# SCM(입고 확정)에서 읽은 항목의 태그 앞에 붙입니다. 입고 등록은 이 태그만 올리므로 ERP 데이터 캐시는 그대로 둡니다.
+SCM_NAMESPACE = 'scm'
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def _dumps(value):
+    """DataFrame은 Parquet, 그 외 값은 pickle로 직렬화합니다."""
+    if isinstance(value, pd.DataFrame):
+        buffer = io.BytesIO()
+        value.to_parquet(buffer, index=False)
+        return b'P' + buffer.getvalue()
+    return b'K' + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _loads(data):
+    if data[:1] == b'P':
+        return pd.read_parquet(io.BytesIO(data[1:]))
+    return pickle.loads(data[1:])
+
+class DiskCache:
+    """
+    로컬 디스크 공유 캐시. 값은 키별 파일(DataFrame은 Parquet)로, 만료 시각과 태그 세대 번호는 SQLite 색인에 둡니다.
+    RedisCache와 같은 인터페이스라서 Redis가 없는 환경의 대체 구현으로도 씁니다.
+    """
+
+    CLEANUP_INTERVAL = 300
+
+    def __init__(self, directory):
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._index = self._dir / 'index.sqlite'
+        self._last_cleanup = 0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS tags (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+
+    @contextmanager
+    def _connect(self):
+        """색인 DB 연결. with 블록이 끝나면 커밋하고 닫습니다."""
+        conn = sqlite3.connect(self._index, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _path(self, key):
+        return self._dir / f"{hashlib.sha1(key.encode()).hexdigest()}.bin"
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] < time.time():
+            return None
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, data, ttl):
+        path = self._path(key)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, expires_at) VALUES (?, ?)", (key, time.time() + ttl)
+            )
+        if time.time() - self._last_cleanup > self.CLEANUP_INTERVAL:
+            self._cleanup()
+
+    def generation(self, tags):
+        tags = list(tags)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT COALESCE(SUM(generation), 0) FROM tags WHERE tag IN ({','.join('?' * len(tags))})", tags
+            ).fetchone()
+        return int(rows[0])
+
+    def bump(self, tags):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO tags (tag, generation) VALUES (?, 1) "
+                "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1",
+                [(tag,) for tag in tags]
+            )
+
+    def _cleanup(self):
+        """만료된 항목의 파일과 색인을 지웁니다."""
+        self._last_cleanup = time.time()
+        with self._connect() as conn:
+            expired = [key for (key,) in conn.execute(
+                "SELECT key FROM entries WHERE expires_at < ?", (self._last_cleanup,)
+            )]
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in expired])
+        for key in expired:
+            self._path(key).unlink(missing_ok=True)
+
+class RedisCache:
+    """
+    Redis 공유 캐시 (서버가 여러 대일 때). redis 패키지가 필요합니다.
+    태그 세대 번호 키에는 만료 시간을 두지 않으므로, maxmemory 정책이 volatile-*이어야 세대 번호가 지워지지 않습니다.
+    """
+
+    def __init__(self, url, prefix='input_management:'):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        return self._client.get(f"{self._prefix}v:{key}")
+
+    def set(self, key, data, ttl):
+        self._client.set(f"{self._prefix}v:{key}", data, ex=max(int(ttl), 1))
+
+    def generation(self, tags):
+        values = self._client.mget([f"{self._prefix}tag:{tag}" for tag in tags])
+        return sum(int(value or 0) for value in values)
+
+    def bump(self, tags):
+        pipe = self._client.pipeline()
+        for tag in tags:
+            pipe.incr(f"{self._prefix}tag:{tag}")
+        pipe.execute()
+
+def get_shared_cache():
+    """설정(shared_cache_backend)에 맞는 프로세스 공용 백엔드. 끄거나 만들 수 없으면 None입니다."""
+    global _backend
+    if CACHE_BACKEND == 'none':
+        return None
+    with _backend_lock:
+        if _backend is None:
+            try:
+                if CACHE_BACKEND == 'redis':
+                    _backend = RedisCache(get_setting('shared_cache_redis_url', 'redis://localhost:6379/0'))
+                else:
+                    _backend = DiskCache(CACHE_DIR)
+            except Exception as e:
+                record('shared_cache.error', op='init', backend=CACHE_BACKEND, error=str(e))
+                return None
+        return _backend
+
+def date_tags(start, end=None):
+    """[start, end) 기간이 걸친 월 태그 목록 (예: 'date:2024-05'). end가 없으면 OPEN_RANGE_DAYS까지입니다."""
+    start = pd.Timestamp(start).date().replace(day=1)
+    end = pd.Timestamp(end).date() if end is not None else start + timedelta(days=OPEN_RANGE_DAYS)
+    tags = []
+    month = start
+    while month < end:
+        tags.append(f"date:{month:%Y-%m}")
+        month = (month + timedelta(days=32)).replace(day=1)
+    return tags or [f"date:{start:%Y-%m}"]
+
+def po_tags(pos):
+    """발주번호 태그 목록 (예: 'po:PO123')."""
+    return [f"po:{po}" for po in sorted({str(po) for po in pos if pd.notna(po)})]
+
+def scm_tags(tags):
+    """SCM에서 읽은 캐시 항목용 태그 목록 (예: 'scm:po:PO123', 'scm:date:2024-05')."""
+    return [f"{SCM_NAMESPACE}:{tag}" for tag in tags]
+
+def shared_generation(tags):
+    """tags 중 하나라도 무효화되면 커지는 세대 번호. 프로세스별 캐시 키에 넣으면 다른 프로세스의 무효화를 따라갑니다."""
+    backend = get_shared_cache()
+    if backend is None:
+        return 0
+    try:
+        return backend.generation([ALL_TAG, *tags])
+    except Exception as e:
+        record('shared_cache.error', op='generation', error=str(e))
+        return 0
+
+def shared_call(name, func, args, tags=(), ttl=600):
+    """
+    func(*args) 결과를 공유 캐시에서 읽고, 없으면 실행해 ttl초 동안 넣어 둡니다.
+    키에 tags의 세대 번호가 들어가므로 invalidate(tags)한 항목은 더 이상 읽히지 않습니다 (지워지지는 않고 만료됨).
+    공유 캐시 오류는 기록만 하고 func 결과를 그대로 씁니다.
+    """
+    backend = get_shared_cache()
+    if backend is None:
+        return func(*args)
+    digest = hashlib.sha1(repr(args).encode()).hexdigest()
+    try:
+        key = f"{name}:{digest}:{backend.generation([ALL_TAG, *tags])}"
+        data = backend.get(key)
+    except Exception as e:
+        record('shared_cache.error', op='get', name=name, error=str(e))
+        return func(*args)
+    if data is not None:
+        record('shared_cache.get', name=name, hit=True, bytes=len(data))
+        return _loads(data)
+
+    value = func(*args)
+    try:
+        data = _dumps(value)
+        backend.set(key, data, ttl)
+        record('shared_cache.get', name=name, hit=False, bytes=len(data))
+    except Exception as e:
+        record('shared_cache.error', op='set', name=name, error=str(e))
+    return value
+
+def invalidate(tags=None):
+    """tags(발주번호·월 태그, SCM 항목은 scm_tags)가 붙은 공유 캐시 항목을 모든 프로세스에서 무효화합니다. tags가 없으면 전체입니다."""
+    backend = get_shared_cache()
+    if backend is None:
+        return
+    tags = list(tags) if tags else [ALL_TAG]
+    try:
+        backend.bump(tags)
+        record('shared_cache.invalidate', tags=len(tags))
+    except Exception as e:
+        record('shared_cache.error', op='invalidate', error=str(e))
@@ -0,0 +1,127 @@
+# utils/submission_store.py
+from datetime import date
+import pandas as pd
+
+# 편집 리스트의 행 키. 같은 키의 품목을 다시 추가하면 기존 행(편집 내용 포함)을 유지합니다.
+SUBMISSION_KEY_COLUMNS = ['발주번호', '품번', '버전']
+
+def row_key(row):
+    """행(dict)의 (발주번호, 품번, 버전) 키. 빈 값은 ''로 맞춥니다."""
+    return tuple('' if pd.isna(row.get(col)) else str(row.get(col)) for col in SUBMISSION_KEY_COLUMNS)
+
+def init_store(state):
+    """
+    세션 상태에 편집 리스트 저장소를 만듭니다.
+    submission_rows: 키 → 행(dict), submission_version: 행 구성이 바뀔 때마다 올라가는 번호
+    """
+    if 'submission_rows' not in state:
+        state.submission_rows = {}
+        state.submission_version = 0
+        state.submission_added_seq = 0
+        _invalidate_frame(state)
+
+def editor_key(state):
+    """st.data_editor 위젯 키. 버전이 바뀌면 위젯이 새 기준 데이터로 다시 만들어집니다."""
+    return f"submission_editor_{state.submission_version}"
+
+def _invalidate_frame(state):
+    state.submission_frame = None
+    state.submission_frame_keys = []
+    # 기준 DataFrame을 만든 뒤 셀 편집이 저장소에만 반영되었는지 (위젯 변경분이 그 차이를 들고 있음)
+    state.submission_frame_edited = False
+
+def _bump_version(state):
+    state.submission_version += 1
+    _invalidate_frame(state)
+
+def get_editor_frame(state):
+    """
+    st.data_editor에 넘길 기준 DataFrame. 행 구성이 바뀐 뒤 처음 한 번만 만듭니다.
+    셀 편집은 기준 DataFrame을 바꾸지 않고 위젯 변경분으로 남으므로, 다른 페이지에 다녀와
+    위젯 상태가 사라졌을 때만 저장소의 편집 내용으로 다시 만듭니다.
+    """
+    if state.get('submission_frame_edited') and editor_key(state) not in state:
+        _invalidate_frame(state)
+    if state.submission_frame is None:
+        keys = list(state.submission_rows)
+        state.submission_frame_keys = keys
+        state.submission_frame = pd.DataFrame.from_records([state.submission_rows[key] for key in keys])
+    return state.submission_frame
+
+def is_empty(state):
+    return not state.submission_rows
+
+def commit_editor_delta(state):
+    """
+    st.data_editor의 변경분(edited_rows/added_rows/deleted_rows)만 저장소에 반영합니다.
+    편집기의 on_change 콜백으로 편집할 때마다 부르므로, 다른 페이지로 갔다 와도 편집 내용이 남습니다.
+    셀 편집은 같은 기준 DataFrame에 다시 적용해도 결과가 같으므로 저장소에만 반영하고 위젯을 그대로 둡니다
+    (스크롤 위치·포커스 유지). 행을 추가하거나 지웠을 때만 버전을 올려 위젯을 새 기준 데이터로 다시 만듭니다.
+    """
+    delta = state.get(editor_key(state))
+    if not delta:
+        return False
+    edited = delta.get('edited_rows', {})
+    added = delta.get('added_rows', [])
+    deleted = delta.get('deleted_rows', [])
+    if not (edited or added or deleted):
+        return False
+
+    keys = state.submission_frame_keys
+    rows = state.submission_rows
+    for pos, changes in edited.items():
+        rows[keys[int(pos)]].update(changes)
+    if not (added or deleted):
+        state.submission_frame_edited = True
+        return True
+    for pos in deleted:
+        rows.pop(keys[int(pos)], None)
+    for new_row in added:
+        # 직접 추가한 행은 ERP 품목과 겹치지 않도록 별도 키를 씁니다.
+        state.submission_added_seq += 1
+        rows[('__added__', state.submission_added_seq)] = {'삭제': False, **new_row}
+    _bump_version(state)
+    return True
+
+def add_items(state, items_df):
+    """
+    선택된 품목을 편집 리스트에 추가합니다. 이미 있는 키는 건너뜁니다.
+    반환값: (추가된 행 수, 건너뛴 행 수)
+    """
+    commit_editor_delta(state)
+    added = skipped = 0
+    today = date.today().strftime("%Y-%m-%d")
+    for item in items_df.to_dict('records'):
+        key = row_key(item)
+        if key in state.submission_rows:
+            skipped += 1
+            continue
+        state.submission_rows[key] = {
+            **item, '삭제': False, '입고일자': today, 'LOT': '', '유통기한': '', '확정수량': 0
+        }
+        added += 1
+    if added:
+        _bump_version(state)
+    return added, skipped
+
+def remove_flagged(state):
+    """'삭제'가 체크된 행을 지웁니다."""
+    commit_editor_delta(state)
+    flagged = [key for key, row in state.submission_rows.items() if row.get('삭제')]
+    for key in flagged:
+        del state.submission_rows[key]
+    if flagged:
+        _bump_version(state)
+    return len(flagged)
+
+def clear_store(state):
+    """편집 리스트를 비웁니다."""
+    state.submission_rows = {}
+    _bump_version(state)
+
+def to_frame(state):
+    """편집 중인 변경분까지 반영한 전체 편집 리스트를 DataFrame으로 반환합니다 (전송/검증용, 편집기와 같은 행 순서)."""
+    commit_editor_delta(state)
+    if not state.get('submission_frame_edited'):
+        return get_editor_frame(state)
+    return pd.DataFrame.from_records(list(state.submission_rows.values()))
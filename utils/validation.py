@@ -0,0 +1,117 @@
+# utils/validation.py
+import numpy as np
+import pandas as pd
+from utils.settings import get_setting
+
+# 확정수량이 예정수량을 넘어도 되는 비율 (0.1 = 10%까지 허용)
+QTY_TOLERANCE = get_setting('validation_qty_tolerance', 0.1)
+# 유통기한이 입고일자로부터 이 햇수를 넘으면 입력 오류로 봅니다.
+MAX_SHELF_YEARS = get_setting('validation_max_shelf_years', 10)
+# 한 배치 안에서 겹치면 안 되는 키 (scm.input_manage_master의 멱등 키와 같음)
+BATCH_KEY_COLUMNS = ['발주번호', '품번', '버전', 'LOT']
+ERROR_COLUMNS = ['행', '열', '심각도', '메시지']
+
+def _text(series):
+    """빈 값은 ''인 앞뒤 공백 없는 문자열 열."""
+    return series.astype(object).where(series.notna(), '').astype(str).str.strip()
+
+def parse_dates(series):
+    """
+    'YYYY-MM-DD', 'YYYY.MM.DD', 'YYYY/MM/DD', 'YYYYMMDD' 형식의 날짜 열을 datetime으로 바꿉니다.
+    해석할 수 없는 값은 NaT입니다.
+    """
+    text = _text(series).str.replace(r'[./]', '-', regex=True)
+    text = text.where(~text.str.fullmatch(r'\d{8}'), text.str[:4] + '-' + text.str[4:6] + '-' + text.str[6:])
+    return pd.to_datetime(text.str[:10], format='%Y-%m-%d', errors='coerce')
+
+def _annotate(mask, column, message, severity='error'):
+    """mask가 참인 행마다 (행, 열, 심각도, 메시지) 주석을 만듭니다. message는 문자열 또는 행별 Series입니다."""
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return None
+    messages = message[mask] if isinstance(message, pd.Series) else message
+    return pd.DataFrame({
+        '행': np.flatnonzero(mask), '열': column, '심각도': severity, '메시지': messages,
+    })
+
+def validate_submission(df, existing=None, tolerance=None, max_shelf_years=None):
+    """
+    편집 리스트 전체를 한 번에 검증해 셀 단위 오류 목록(행 위치, 열, 심각도, 메시지)을 반환합니다.
+    existing은 같은 발주번호들의 기존 입고 확정 행(발주번호, 품번, 버전, LOT, 입고수량)입니다.
+    심각도가 'error'인 항목이 하나라도 있으면 전송하지 않고, 'warning'은 확인 후 전송합니다.
+    모든 검사는 열 단위 연산이라 행 수가 많아도 행마다 Python 코드를 돌지 않습니다.
+    """
+    tolerance = QTY_TOLERANCE if tolerance is None else tolerance
+    max_shelf_years = MAX_SHELF_YEARS if max_shelf_years is None else max_shelf_years
+    if df.empty:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+    df = df.reset_index(drop=True)
+    annotations = []
+
+    # LOT: 필수
+    lot = _text(df['LOT'])
+    annotations.append(_annotate(lot == '', 'LOT', 'LOT 번호는 필수 입력 항목입니다.'))
+
+    # 입고일자/유통기한: 날짜 형식과 범위 (유통기한은 입력한 경우에만 검사합니다)
+    received_on = parse_dates(df['입고일자'])
+    annotations.append(_annotate(received_on.isna(), '입고일자', '입고일자를 YYYY-MM-DD 형식으로 입력하세요.'))
+    expiry_text = _text(df['유통기한'])
+    expiry = parse_dates(df['유통기한'])
+    annotations.append(_annotate(
+        (expiry_text != '') & expiry.isna(), '유통기한', '유통기한을 YYYY-MM-DD 형식으로 입력하세요.'
+    ))
+    annotations.append(_annotate(expiry <= received_on, '유통기한', '유통기한이 입고일자보다 빠르거나 같습니다.'))
+    annotations.append(_annotate(
+        expiry > received_on + pd.DateOffset(years=max_shelf_years), '유통기한',
+        f'유통기한이 입고일자로부터 {max_shelf_years}년을 넘습니다.'
+    ))
+
+    # 확정수량: 1 이상, 예정수량 대비 허용 범위 안
+    confirmed = pd.to_numeric(df['확정수량'], errors='coerce')
+    annotations.append(_annotate(
+        confirmed.isna() | (confirmed <= 0) | (confirmed % 1 != 0), '확정수량', '확정수량은 1 이상의 정수여야 합니다.'
+    ))
+    if '예정수량' in df.columns:
+        planned = pd.to_numeric(df['예정수량'], errors='coerce')
+        limit = np.floor(planned * (1 + tolerance))
+        annotations.append(_annotate(
+            planned.notna() & (confirmed > limit), '확정수량',
+            '확정수량이 예정수량(' + planned.fillna(0).astype(int).astype(str)
+            + f')의 허용 범위({tolerance:.0%})를 넘습니다.'
+        ))
+
+    # 배치 안 중복 키: 같은 (발주번호, 품번, 버전, LOT)는 한 행만
+    keys = pd.DataFrame({col: _text(df[col]) for col in BATCH_KEY_COLUMNS})
+    annotations.append(_annotate(
+        (lot != '') & keys.duplicated(keep=False), 'LOT', '같은 발주번호/품번/버전/LOT 행이 리스트에 여러 개 있습니다.'
+    ))
+
+    # 기존 입고 확정과 충돌: 같은 키가 다른 수량으로 이미 등록됨 (같은 수량이면 재전송으로 보고 통과)
+    if existing is not None and not existing.empty:
+        registered = pd.DataFrame({col: _text(existing[col]) for col in BATCH_KEY_COLUMNS}).assign(
+            기존수량=pd.to_numeric(existing['입고수량'], errors='coerce')
+        ).drop_duplicates(BATCH_KEY_COLUMNS)
+        previous = keys.merge(registered, on=BATCH_KEY_COLUMNS, how='left')['기존수량']
+        annotations.append(_annotate(
+            previous.notna() & (previous != confirmed), '확정수량',
+            '이미 다른 수량(' + previous.fillna(0).astype(int).astype(str) + ')으로 등록된 LOT입니다. 전송하면 덮어씁니다.',
+            severity='warning'
+        ))
+
+    annotations = [a for a in annotations if a is not None]
+    if not annotations:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+    return pd.concat(annotations, ignore_index=True).sort_values(['행', '열'], ignore_index=True)
+
+def has_errors(errors):
+    """전송을 막는 오류가 있는지 여부."""
+    return bool((errors['심각도'] == 'error').any())
+
+def annotation_frame(df, errors):
+    """df와 같은 모양의 셀별 오류 메시지 표 (오류 없는 셀은 '')."""
+    cells = pd.DataFrame('', index=range(len(df)), columns=df.columns)
+    if errors.empty:
+        return cells
+    messages = errors.groupby(['행', '열'])['메시지'].agg(' / '.join).unstack('열')
+    cells.update(messages.reindex(index=cells.index, columns=cells.columns))
+    return cells.fillna('')